@@ -0,0 +1,126 @@
+"""
+Attendance lookups on a long synthetic history: old date(timestamp)/LIKE filters vs att_date + indexes.
+
+Usage:
+    python benchmarks/bench_attendance_queries.py [--rows 5000000] [--students 2000] [--group-size 40] [--db path]
+
+The history is generated inside SQLite (recursive CTE), one row per student per day,
+so 5M rows with 2000 students is ~7 years of daily lectures. Pass --db to keep the
+generated file and reuse it on the next run. Old-style queries run with NOT INDEXED,
+i.e. against the table as it was before the migration (no indexes at all).
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.persistence import DatabaseManager
+
+
+def generate(db_path, rows, students, group_size):
+    DatabaseManager(db_path).close()  # schema, migration and indexes
+    conn = sqlite3.connect(db_path)
+    (have,) = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()
+    if have >= rows:
+        conn.close()
+        return
+
+    t0 = time.perf_counter()
+    conn.execute("DELETE FROM attendance")
+    # Bulk-load without indexes, then build them once
+    conn.execute("DROP INDEX IF EXISTS idx_attendance_group_date")
+    conn.execute("DROP INDEX IF EXISTS idx_attendance_student_date")
+    conn.execute("DROP INDEX IF EXISTS idx_attendance_unique_day")
+    conn.execute("PRAGMA user_version = 2")  # re-run the attendance migrations afterwards
+    conn.execute(
+        """
+        WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i < ? - 1)
+        INSERT INTO attendance (student_id, group_id, timestamp, att_date, status)
+        SELECT (i % ?) + 1,
+               (i % ?) / ? + 1,
+               datetime('2019-01-01', '+' || (i / ?) || ' days', '+9 hours'),
+               date('2019-01-01', '+' || (i / ?) || ' days'),
+               CASE WHEN i % 7 = 0 THEN 'ABSENT' ELSE 'PRESENT' END
+        FROM n
+    """,
+        (rows, students, students, group_size, students, students),
+    )
+    conn.commit()
+    t1 = time.perf_counter()
+    conn.close()
+    DatabaseManager(db_path).close()  # migrations 3-4 recreate the indexes
+    print(f"generated {rows:,} rows in {t1 - t0:.1f}s, indexed in {time.perf_counter() - t1:.1f}s")
+
+
+def timed(conn, sql, args, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(sql, args).fetchall()
+    return (time.perf_counter() - t0) / repeat * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5_000_000)
+    ap.add_argument("--students", type=int, default=2000)
+    ap.add_argument("--group-size", type=int, default=40)
+    ap.add_argument("--repeat", type=int, default=3, help="runs per old-style query (they are slow)")
+    ap.add_argument("--db", default=None)
+    args = ap.parse_args()
+
+    tmp = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, "history.db")
+    generate(db_path, args.rows, args.students, args.group_size)
+
+    conn = sqlite3.connect(db_path)
+    (last_day,) = conn.execute("SELECT MAX(att_date) FROM attendance").fetchone()
+    student, group = 17, 3
+
+    cases = [
+        (
+            "today's attendance (group)",
+            "SELECT student_id, status FROM attendance NOT INDEXED WHERE group_id=? AND date(timestamp)=?",
+            "SELECT student_id, status FROM attendance WHERE group_id=? AND att_date=?",
+            (group, last_day),
+        ),
+        (
+            "already marked? (student)",
+            "SELECT id FROM attendance NOT INDEXED WHERE student_id=? AND date(timestamp)=?",
+            "SELECT id FROM attendance WHERE student_id=? AND att_date=?",
+            (student, last_day),
+        ),
+        (
+            "session attendance (group, date)",
+            "SELECT student_id, status, timestamp FROM attendance NOT INDEXED WHERE group_id=? AND timestamp LIKE ?",
+            "SELECT student_id, status, timestamp FROM attendance WHERE group_id=? AND att_date=?",
+            (group, last_day),
+        ),
+    ]
+
+    (total,) = conn.execute("SELECT COUNT(*) FROM attendance").fetchone()
+    print(f"{total:,} attendance rows\n")
+    print(f"{'query':<34}{'old ms':>12}{'new ms':>12}{'speedup':>10}")
+    for name, old_sql, new_sql, params in cases:
+        old_params = (params[0], params[1] + "%") if "LIKE" in old_sql else params
+        old_ms = timed(conn, old_sql, old_params, args.repeat)
+        new_ms = timed(conn, new_sql, params, 200)
+        print(f"{name:<34}{old_ms:>12.2f}{new_ms:>12.3f}{old_ms / max(new_ms, 1e-6):>9.0f}x")
+
+    print("\nplans:")
+    for name, _, new_sql, params in cases:
+        plan = conn.execute("EXPLAIN QUERY PLAN " + new_sql, params).fetchall()
+        print(f"  {name}: {plan[0][-1]}")
+    conn.close()
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-call latency of DatabaseManager methods: connection per call vs persistent connections.
+
+Usage:
+    python benchmarks/bench_db.py [--students 40] [--calls 2000]
+
+"before" reproduces the old behaviour (sqlite3.connect + close in every method,
+default rollback journal); "after" is the current thread-local WAL connection.
+Both run against fresh temporary databases.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.persistence import DatabaseManager
+
+
+class PerCallDatabaseManager(DatabaseManager):
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+
+def per_call_us(fn, calls):
+    with contextlib.redirect_stdout(io.StringIO()):  # some methods print diagnostics
+        t0 = time.perf_counter()
+        for i in range(calls):
+            fn(i)
+        elapsed = time.perf_counter() - t0
+    return elapsed / calls * 1e6
+
+
+def run(db, students, calls):
+    db.add_students_bulk([(f"S{i}", str(1000 + i), 1, None) for i in range(students)])
+    ids = [s.id for s in db.get_all_students()]
+    return {
+        # Video loop: re-marking already-present students (the common case) and first marks
+        "mark_attendance": per_call_us(lambda i: db.mark_attendance(ids[i % len(ids)], 1), calls),
+        "get_todays_attendance": per_call_us(lambda i: db.get_todays_attendance(1), calls),
+        "get_student": per_call_us(lambda i: db.get_student(ids[i % len(ids)]), calls),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--students", type=int, default=40)
+    ap.add_argument("--calls", type=int, default=2000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = run(PerCallDatabaseManager(os.path.join(tmp, "before", "a.db")), args.students, args.calls)
+        after_db = DatabaseManager(os.path.join(tmp, "after", "a.db"))
+        after = run(after_db, args.students, args.calls)
+        after_db.close()
+
+    print(f"{'method':<24}{'before us/call':>16}{'after us/call':>16}{'speedup':>10}")
+    for name in before:
+        print(f"{name:<24}{before[name]:>16.1f}{after[name]:>16.1f}{before[name] / after[name]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
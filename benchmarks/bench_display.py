@@ -0,0 +1,136 @@
+"""
+Camera -> Tk display path: per-frame allocations and time, old pipeline vs buffer reuse.
+
+Usage:
+    python benchmarks/bench_display.py [--frames 500] [--width 640] [--height 480] [--faces 4]
+
+old:  cap.read() returns a new array, cvtColor allocates the RGB frame, the UI loop
+      copies it, draws, wraps it with Image.fromarray and builds a new PhotoImage.
+new:  cap.read() decodes into one reused buffer, cvtColor writes into a ring slot
+      (CameraManager), the UI converts into a reusable RGBX overlay buffer shared
+      with a PIL image (Image.frombuffer) and paste()s it into one PhotoImage.
+
+Allocation figures come from tracemalloc (NumPy buffers are traced): the peak
+extra memory held while one frame goes through the pipeline, and how much the
+traced total moved over the run. Pillow's internal block used by PhotoImage
+creation/paste is not traced. Without a display the Tk step is skipped.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def draw_overlays(draw, boxes):
+    for i, (t, r, b, l) in enumerate(boxes):
+        color = (0, 255, 0) if i % 2 else (255, 0, 0)
+        cv2.rectangle(draw, (l, t), (r, b), color, 2)
+        cv2.putText(draw, f"Student {i}", (l, b + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    cv2.putText(draw, "FPS: 30 | REC: 8", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+
+
+class OldPipeline:
+    def __init__(self, tk_root):
+        self.tk_root = tk_root
+        self.keep = None
+
+    def frame(self, source, boxes):
+        bgr = source.copy()                               # cap.read() without a buffer
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)        # capture thread
+        draw = rgb.copy()                                 # update_video_loop
+        draw_overlays(draw, boxes)
+        img = Image.fromarray(draw)
+        if self.tk_root is not None:
+            from PIL import ImageTk
+            self.keep = ImageTk.PhotoImage(img, master=self.tk_root)
+            self.tk_root.update_idletasks()
+
+
+class NewPipeline:
+    def __init__(self, tk_root, shape, ring_size=4):
+        h, w = shape[:2]
+        self.tk_root = tk_root
+        self.raw = np.empty((h, w, 3), dtype=np.uint8)
+        self.ring = [np.empty((h, w, 3), dtype=np.uint8) for _ in range(ring_size)]
+        self.slot = 0
+        self.overlay = np.empty((h, w, 4), dtype=np.uint8)
+        self.overlay_image = Image.frombuffer("RGBX", (w, h), self.overlay, "raw", "RGBX", 0, 1)
+        self.photo = None
+        if tk_root is not None:
+            from PIL import ImageTk
+            self.photo = ImageTk.PhotoImage("RGB", (w, h), master=tk_root)
+
+    def frame(self, source, boxes):
+        np.copyto(self.raw, source)                       # cap.read(raw)
+        self.slot = (self.slot + 1) % len(self.ring)
+        rgb = cv2.cvtColor(self.raw, cv2.COLOR_BGR2RGB, dst=self.ring[self.slot])
+        draw = cv2.cvtColor(rgb, cv2.COLOR_RGB2RGBA, dst=self.overlay)
+        draw_overlays(draw, boxes)
+        if self.photo is not None:
+            self.photo.paste(self.overlay_image)
+            self.tk_root.update_idletasks()
+
+
+def run(pipeline, frames, boxes, n):
+    for i in range(20):  # warm-up: first-use allocations (ring, fonts, Tk) are not per-frame cost
+        pipeline.frame(frames[i % len(frames)], boxes)
+
+    times, peaks = [], []
+    tracemalloc.start()
+    start_current, _ = tracemalloc.get_traced_memory()
+    for i in range(n):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        pipeline.frame(frames[i % len(frames)], boxes)
+        times.append((time.perf_counter() - t0) * 1000.0)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    end_current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), statistics.median(peaks), end_current - start_current
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=500)
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    ap.add_argument("--faces", type=int, default=4)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(8)]
+    boxes = [(60 + 30 * i, 140 + 110 * i, 160 + 30 * i, 40 + 110 * i) for i in range(args.faces)]
+
+    tk_root = None
+    try:
+        import tkinter as tk
+        tk_root = tk.Tk()
+        tk_root.withdraw()
+    except Exception as e:
+        print(f"no display ({e}); Tk step skipped\n")
+
+    frame_kb = args.height * args.width * 3 / 1024
+    print(f"{args.width}x{args.height}, {args.faces} faces, {args.frames} frames (one RGB frame = {frame_kb:.0f} KB)\n")
+    print(f"{'pipeline':<10}{'ms/frame':>10}{'peak KB/frame':>16}{'frame buffers':>15}{'net KB':>10}")
+    for label, pipeline in (
+        ("old", OldPipeline(tk_root)),
+        ("new", NewPipeline(tk_root, frames[0].shape)),
+    ):
+        ms, peak, net = run(pipeline, frames, boxes, args.frames)
+        print(f"{label:<10}{ms:>10.3f}{peak / 1024:>16.0f}{peak / 1024 / frame_kb:>15.1f}{net / 1024:>10.0f}")
+
+    if tk_root is not None:
+        tk_root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Scaling benchmark for EncodingPool (face encoding across 1..N processes).
+
+Usage:
+    python benchmarks/bench_encoding_pool.py [--faces 12] [--max-workers 8] [--image path.jpg]
+
+Without --image a synthetic 640x480 frame is used with a grid of fake face boxes;
+dlib still runs landmarks + the full ResNet per box, so the cost per face is realistic.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import face_recognition
+
+from src.parallel import EncodingPool
+
+
+def make_frame(args):
+    if args.image:
+        frame = face_recognition.load_image_file(args.image)
+        locs = face_recognition.face_locations(frame)
+        if locs:
+            # Repeat real boxes to reach the requested face count
+            return frame, [locs[i % len(locs)] for i in range(args.faces)]
+    else:
+        frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    locs = []
+    size = 80
+    for i in range(args.faces):
+        top = 20 + (i // 6) * (size + 10)
+        left = 20 + (i % 6) * (size + 20)
+        locs.append((top, left + size, top + size, left))
+    return frame, locs
+
+
+def time_it(fn, repeats):
+    fn()  # warm-up (loads models / maps shared memory)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats * 1000.0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--faces", type=int, default=12)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--image", default=None)
+    args = ap.parse_args()
+
+    frame, locs = make_frame(args)
+    base = time_it(lambda: face_recognition.face_encodings(frame, locs), args.repeats)
+    print(f"{len(locs)} faces, frame {frame.shape[1]}x{frame.shape[0]}")
+    print(f"{'workers':>8} {'ms/frame':>10} {'speedup':>8}")
+    print(f"{'serial':>8} {base:10.1f} {1.0:8.2f}")
+
+    for n in range(1, args.max_workers + 1):
+        pool = EncodingPool(n)
+        try:
+            ms = time_it(lambda: pool.encode(frame, locs), args.repeats)
+        finally:
+            pool.close()
+        print(f"{n:>8} {ms:10.1f} {base / ms:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Recall@1 and latency of gallery indexes against the exact flat baseline.
+
+Usage:
+    python benchmarks/bench_index.py [--gallery 20000] [--queries 500] [--batch 10]
+
+The gallery is synthetic: clustered 128-d vectors with dlib-like scale, and queries
+are enrolled rows plus noise (same-person distance ~0.35, below the 0.50 threshold).
+"Safe" counts queries where IVF returns the same identity accepted/rejected as flat.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from src.index import FlatIndex, IVFIndex
+
+
+def synthetic_gallery(n, rng, clusters=64):
+    centers = rng.normal(0, 0.09, (clusters, 128))
+    labels = rng.integers(0, clusters, n)
+    return centers[labels] + rng.normal(0, 0.05, (n, 128))
+
+
+def timed_search(index, queries, batch, k=1):
+    idx, dist = [], []
+    t0 = time.perf_counter()
+    for a in range(0, len(queries), batch):
+        i, d = index.search(queries[a:a + batch], k)
+        idx.append(i)
+        dist.append(d)
+    ms = (time.perf_counter() - t0) * 1000.0 / max(1, len(queries) // batch)
+    return np.vstack(idx), np.vstack(dist), ms
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--gallery", type=int, default=20000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--batch", type=int, default=10, help="faces per frame")
+    ap.add_argument("--threshold", type=float, default=0.50)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    gallery = synthetic_gallery(args.gallery, rng)
+    truth = rng.integers(0, args.gallery, args.queries)
+    queries = gallery[truth] + rng.normal(0, 0.035, (args.queries, 128))
+
+    flat = FlatIndex(gallery)
+    f_idx, f_d, f_ms = timed_search(flat, queries, args.batch)
+    f_ok = f_d[:, 0] < args.threshold
+    print(f"gallery={args.gallery} queries={args.queries} batch={args.batch}")
+    print(f"{'index':<22} {'build ms':>9} {'ms/frame':>9} {'recall@1':>9} {'safe':>7}")
+    print(f"{'flat':<22} {0.0:9.1f} {f_ms:9.2f} {np.mean(f_idx[:, 0] == truth):9.4f} {1.0:7.4f}")
+
+    for n_probe in (1, 4, 8, 16, 32):
+        t0 = time.perf_counter()
+        ivf = IVFIndex(gallery, n_probe=n_probe)
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        i_idx, i_d, i_ms = timed_search(ivf, queries, args.batch)
+
+        recall = np.mean(i_idx[:, 0] == f_idx[:, 0])
+        i_ok = i_d[:, 0] < args.threshold
+        safe = np.mean((i_ok == f_ok) & (~f_ok | (i_idx[:, 0] == f_idx[:, 0])))
+        label = f"ivf lists={ivf.n_lists} probe={ivf.n_probe}"
+        print(f"{label:<22} {build_ms:9.1f} {i_ms:9.2f} {recall:9.4f} {safe:7.4f}")
+
+
+if __name__ == "__main__":
+    main()
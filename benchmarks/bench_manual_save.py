@@ -0,0 +1,96 @@
+"""
+Manual attendance save (the Manual tab's "Save Changes") for large groups on a long history.
+
+Usage:
+    python benchmarks/bench_manual_save.py [--rows 2000000] [--students 2000] [--group-size 200] [--db path]
+
+Compares three implementations of saving one group's list for one day:
+- per-student loop, original SQL: DELETE ... timestamp LIKE + INSERT, no attendance indexes
+- per-student loop on att_date with the indexes (DELETE + INSERT per student)
+- DatabaseManager.save_manual_attendance: one executemany UPSERT on UNIQUE(student_id, group_id, att_date)
+Every variant rewrites the same existing day, so each run replaces group-size rows.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_attendance_queries import generate
+from src.persistence import DatabaseManager
+
+
+def loop_save(conn, group_id, date_str, att_map, indexed):
+    table = "attendance" if indexed else "attendance NOT INDEXED"
+    where = "att_date = ?" if indexed else "timestamp LIKE ?"
+    day = date_str if indexed else f"{date_str}%"
+    for student_id, data in att_map.items():
+        ts = f"{date_str} {data['time']}" if data["time"] else f"{date_str} 00:00:00"
+        conn.execute(f"DELETE FROM {table} WHERE student_id = ? AND group_id = ? AND {where}", (student_id, group_id, day))
+        conn.execute(
+            "INSERT INTO attendance (student_id, group_id, timestamp, att_date, status) VALUES (?, ?, ?, ?, ?)",
+            (student_id, group_id, ts, date_str, data["status"]),
+        )
+    conn.commit()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=2_000_000)
+    ap.add_argument("--students", type=int, default=2000)
+    ap.add_argument("--group-size", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--db", default=None)
+    args = ap.parse_args()
+
+    tmp = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, "history.db")
+    generate(db_path, args.rows, args.students, args.group_size)
+
+    conn = sqlite3.connect(db_path)
+    (day,) = conn.execute("SELECT MAX(att_date) FROM attendance").fetchone()
+    group_id = 2
+    students = [r[0] for r in conn.execute("SELECT DISTINCT student_id FROM attendance WHERE group_id=? AND att_date=?", (group_id, day))]
+    att_map = {sid: {"status": "PRESENT" if i % 3 else "ABSENT", "time": "09:00:00" if i % 3 else None}
+               for i, sid in enumerate(students)}
+    print(f"{args.rows:,} history rows, saving {len(att_map)} students\n")
+
+    db = DatabaseManager(db_path)
+    results = {}
+
+    # The original loop can't run with the unique index in place (its INSERT is plain), so drop it just for this case
+    conn.execute("DROP INDEX idx_attendance_unique_day")
+    for name, fn in (
+        ("loop, LIKE, no indexes", lambda: loop_save(conn, group_id, day, att_map, indexed=False)),
+        ("loop, att_date indexes", lambda: loop_save(conn, group_id, day, att_map, indexed=True)),
+    ):
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        results[name] = (time.perf_counter() - t0) / args.repeat * 1000.0
+    conn.execute("CREATE UNIQUE INDEX idx_attendance_unique_day ON attendance(student_id, group_id, att_date)")
+    conn.commit()
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        assert db.save_manual_attendance(group_id, day, att_map)
+    results["set-based upsert"] = (time.perf_counter() - t0) / args.repeat * 1000.0
+    db.close()
+    conn.close()
+
+    base = results["loop, LIKE, no indexes"]
+    print(f"{'implementation':<28}{'ms/save':>10}{'speedup':>10}")
+    for name, ms in results.items():
+        print(f"{name:<28}{ms:>10.1f}{base / ms:>9.1f}x")
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Startup cost before the login window: import time and time to first paint.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5]
+
+Every measurement runs in a fresh interpreter (inside a temporary working
+directory, so the app's data/ folder is not touched). "eager" reproduces the
+previous startup: face_recognition, cv2 and PIL imported and FaceRecognizer
+built with its gallery loaded before the window exists. "lazy" is the current
+src.app. Opening the camera device (which the old constructor also did) is not
+included. Time to first paint needs a display; without one it is skipped.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("face_recognition", "dlib", "cv2", "PIL.ImageTk", "numpy")
+
+EAGER = """
+import cv2
+from PIL import Image, ImageTk
+from src.persistence import DatabaseManager
+from src.vision import FaceRecognizer
+_vision = FaceRecognizer()
+_vision.load_encodings([s for s in DatabaseManager().get_all_students() if s.encoding_path])
+"""
+
+IMPORT_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import src.app
+{eager}
+ms = (time.perf_counter() - t0) * 1000.0
+print(json.dumps({{"ms": ms, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+PAINT_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import tkinter as tk
+from src.app import AutoAttendApp
+{eager}
+root = tk.Tk()
+app = AutoAttendApp(root)
+root.update()  # login window laid out and drawn
+ms = (time.perf_counter() - t0) * 1000.0
+root.destroy()
+print(json.dumps({{"ms": ms}}))
+"""
+
+
+def run_child(code, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"
+    return json.loads(proc.stdout.strip().splitlines()[-1]), None
+
+
+def measure(template, eager, runs, cwd):
+    samples, info = [], None
+    for _ in range(runs):
+        out, err = run_child(template.format(eager=EAGER if eager else "", heavy=HEAVY), cwd)
+        if out is None:
+            return None, err
+        samples.append(out["ms"])
+        info = out
+    return statistics.median(samples), info
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as cwd:
+        run_child(IMPORT_CHILD.format(eager=EAGER, heavy=HEAVY), cwd)  # warm the OS file cache, create data/
+
+        note = None
+        print(f"{'startup':<10}{'import ms':>12}{'first paint ms':>18}   modules loaded before login")
+        for label, eager in (("eager", True), ("lazy", False)):
+            import_ms, info = measure(IMPORT_CHILD, eager, args.runs, cwd)
+            if import_ms is None:
+                print(f"{label:<10}  failed: {info}")
+                continue
+            paint_ms, err = measure(PAINT_CHILD, eager, args.runs, cwd)
+            paint = f"{paint_ms:>18.0f}" if paint_ms is not None else f"{'skipped':>18}"
+            print(f"{label:<10}{import_ms:>12.0f}{paint}   {', '.join(info['heavy']) or '-'}")
+            if paint_ms is None:
+                note = err
+        if note:
+            print(f"\nfirst paint skipped: {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-from PIL import Image, ImageTk
-import cv2
 import csv
+import os
 from datetime import datetime
 import time
-from src.hardware import CameraManager
+import threading
+from src.attendance_writer import AttendanceWriter
 from src.persistence import DatabaseManager
-from src.vision import FaceRecognizer
+from src.snapshot import SessionSnapshot
+from src.worker import RecognitionWorker
+
+# cv2, PIL and face_recognition (which loads the dlib models on import, ~1.5 s) are imported
+# where they are first needed, so the login window paints without waiting for them.
 
 class AutoAttendApp:
     def __init__(self, root):
@@ -21,15 +25,35 @@ class AutoAttendApp:
         self.last_fps_text = "FPS: 0"
 
         self.db = DatabaseManager()
-        self.camera = CameraManager()
-        self.vision = FaceRecognizer()
-        
-        self.load_global_data()
+        self.attendance_writer = AttendanceWriter(self.db)  # attendance inserts off the Tk thread
+
+        # Created on demand: the recognizer after a teacher logs in (background thread, see
+        # _start_vision_loading), the camera when a session starts. Admins never load either.
+        self.vision = None
+        self.camera = None
+        self.recognition_worker = None
+        self._vision_thread = None
+        self._vision_ready = threading.Event()
+        self._vision_error = None
         
         self.current_user = None
         self.active_session = None
         self.is_session_active = False
         self.student_tree_map = {}
+        # Students that already have today's attendance row for the active group.
+        # Warmed in refresh_att_list; lets the video loop skip SQLite for repeat sightings.
+        self.session_attendance = set()
+
+        # Live session written to disk every few seconds so a restart resumes in place
+        self.snapshot = SessionSnapshot()
+        self.snapshot_interval = 2.0   # seconds between snapshots while scanning
+        self.snapshot_max_age = 60.0   # older snapshots restore attendance but don't restart the camera
+        self._snapshot_due = 0.0
+
+        # Display buffers reused by update_video_loop (allocated on the first frame)
+        self._shown_seq = 0  # camera sequence number of the frame on screen
+        self._overlay = None
+        self._overlay_image = None
         
         # Admin Selection States
         self.admin_sel_teacher_id = None
@@ -39,14 +63,77 @@ class AutoAttendApp:
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.show_login_screen()
 
-    def load_global_data(self):
+    def load_global_data(self, vision=None):
+        vision = vision or self.vision
+        if vision is None:
+            return  # not loaded yet; the loader reads the gallery itself
         try:
             all_students = self.db.get_all_students()
             valid_students = [s for s in all_students if s.encoding_path]
-            self.vision.load_encodings(valid_students)
+            vision.load_encodings(valid_students)
         except Exception as e:
             print(f"Vision Load Warning: {e}")
 
+    # Load face_recognition (dlib models) and the gallery on a background thread.
+    # Started when a teacher logs in, so the models are usually ready before "Start Session" is pressed.
+    # self.vision is only assigned once fully loaded; Tk code waits with _when_vision_ready / _with_vision
+    # (polls via root.after, never blocks the UI), background threads with _require_vision.
+    def _start_vision_loading(self):
+        if self._vision_thread is None:
+            self._vision_thread = threading.Thread(target=self._load_vision, daemon=True)
+            self._vision_thread.start()
+
+    def _load_vision(self):
+        try:
+            from src.vision import FaceRecognizer
+            vision = FaceRecognizer()
+            self.load_global_data(vision)
+            # Student edits patch the live gallery directly (no full reload per change)
+            self.db.subscribe(vision.on_db_change)
+            self.vision = vision
+        except Exception as e:
+            self._vision_error = str(e)
+            print(f"Vision Load Error: {e}")
+        finally:
+            self._vision_ready.set()
+
+    def _require_vision(self):
+        self._start_vision_loading()
+        self._vision_ready.wait()
+        if self.vision is None:
+            raise RuntimeError(f"Face recognition is unavailable: {self._vision_error}")
+        return self.vision
+
+    def _when_vision_ready(self, callback):
+        self._start_vision_loading()
+        if self._vision_ready.is_set():
+            callback()
+        else:
+            self.root.after(50, lambda: self._when_vision_ready(callback))
+
+    # Run callback(vision) on the Tk thread once the recognizer is loaded. If it is still loading,
+    # a small modal "Loading face models..." window is shown meanwhile instead of freezing the UI.
+    def _with_vision(self, callback):
+        top = None
+        if not self._vision_ready.is_set():
+            top = tk.Toplevel(self.root)
+            top.title("Please wait")
+            top.resizable(False, False)
+            top.withdraw()
+            ttk.Label(top, text="Loading face models...").pack(padx=20, pady=20)
+            top.protocol("WM_DELETE_WINDOW", lambda: None)  # closes itself when loading ends
+            self._prepare_popup(top, 260, 70, modal=True)
+
+        def done():
+            if top is not None and top.winfo_exists():
+                top.destroy()
+            if self.vision is None:
+                messagebox.showerror("Error", f"Face recognition is unavailable: {self._vision_error}")
+                return
+            callback(self.vision)
+
+        self._when_vision_ready(done)
+
     def _setup_styles(self):
         style = ttk.Style()
         style.configure("Title.TLabel", font=("Helvetica", 24, "bold"))
@@ -268,6 +355,7 @@ class AutoAttendApp:
             if data['is_admin'] == 1:
                 self.build_admin_dashboard()
             else:
+                self._start_vision_loading()  # models + gallery load while the dashboard is built
                 self.build_teacher_dashboard()
         else:
             messagebox.showerror("Login Failed", "Invalid credentials")
@@ -336,6 +424,7 @@ class AutoAttendApp:
 
     def logout(self):
         self.stop_camera()
+        self._clear_snapshot()  # logging out ends the session on purpose: nothing to resume
         self.current_user = None
         self.active_session = None
         self.show_login_screen()
@@ -398,6 +487,7 @@ class AutoAttendApp:
         ttk.Button(ctrl_frame, text="+ New Student", command=self.admin_add_student).pack(side="left", padx=5)
         ttk.Button(ctrl_frame, text="🔗 Add Existing / Transfer", command=self.admin_link_existing_student).pack(side="left", padx=5)
         ttk.Button(ctrl_frame, text="📷 Upload Face", command=self.admin_upload_face).pack(side="left", padx=5)
+        ttk.Button(ctrl_frame, text="📁 Bulk Enroll", command=self.admin_bulk_enroll).pack(side="left", padx=5)
         ttk.Button(ctrl_frame, text="- Remove", command=self.admin_delete_student).pack(side="right", padx=5)
         
         list_frame = ttk.Frame(right_frame)
@@ -529,7 +619,6 @@ class AutoAttendApp:
 
             if success:
                 self.refresh_student_list_for_group()
-                self.load_global_data()
                 top.destroy()
             else:
                 self._msg("error", "Error", "Operation failed (check for duplicates).", parent=top)
@@ -548,7 +637,8 @@ class AutoAttendApp:
     # 1) Ensure a student row is selected.
     # 2) Ask the admin to select one or more image files.
     # 3) Send the images to FaceRecognizer.register_faces() to create an encoding.
-    # 4) Save the encoding path into SQLite (linking the student profile to face data).
+    # 4) Save the encoding path into SQLite (linking the student profile to face data);
+    #    the "face_updated" event patches the recognizer's gallery in place.
     # 5) Refresh the student list so the encoding field updates in the UI.
     def admin_upload_face(self):
         sel = self.tree_students.selection()
@@ -560,14 +650,84 @@ class AutoAttendApp:
         student = next((s for s in all_s if str(s.roll_number) == str(roll)), None)
         
         files = filedialog.askopenfilenames(title=f"Photos for {name}", filetypes=[("Images", "*.jpg *.png *.jpeg")])
-        if files and student:
-            path = self.vision.register_faces(files, name, str(roll))
+        if not (files and student):
+            return
+
+        def register(vision):
+            path = vision.register_faces(files, name, str(roll))
             if path:
                 self.db.update_student_face(student.id, path)
-                self.load_global_data()
                 self.refresh_student_list_for_group()
                 messagebox.showinfo("Success", "Face updated.")
 
+        self._with_vision(register)  # first use on an admin login loads the models here
+
+    # Enroll a whole folder of students into the selected group.
+    # 1) Ask for a folder with one sub-folder per roll number (e.g. "1001_Jane_Doe/").
+    # 2) Encode every image in a background thread (BulkEnroller spreads the work over a process pool)
+    #    while a popup shows progress; the UI stays responsive.
+    # 3) Students are saved in one transaction and the gallery file is written once,
+    #    so the recognizer is reloaded a single time at the end.
+    # 4) Show a summary including which images failed and why.
+    def admin_bulk_enroll(self):
+        if not self.admin_sel_group_id:
+            self._msg("warning", "Warning", "Please select a group on the left first.")
+            return
+        folder = filedialog.askdirectory(parent=self.root, title="Folder with one sub-folder per roll number")
+        if not folder:
+            return
+
+        top = tk.Toplevel(self.root)
+        top.title("Bulk Enrollment")
+        top.resizable(False, False)
+        top.withdraw()
+        status = ttk.Label(top, text="Scanning folder...")
+        status.pack(padx=20, pady=(20, 10))
+        bar = ttk.Progressbar(top, length=380, mode="determinate")
+        bar.pack(padx=20, pady=(0, 20))
+        top.protocol("WM_DELETE_WINDOW", lambda: None)  # runs to completion
+        top.update_idletasks()
+        self._prepare_popup(top, 440, 130, modal=True)
+
+        group_id = self.admin_sel_group_id
+        state = {"done": 0, "total": 0, "report": None, "error": None}
+
+        def progress(done, total, path, error):
+            state["done"], state["total"] = done, total
+
+        def run():
+            try:
+                from src.enrollment import BulkEnroller
+                state["report"] = BulkEnroller(self.db, self._require_vision()).enroll(folder, group_id, progress)
+            except Exception as e:
+                state["error"] = str(e)
+
+        def poll():
+            if state["total"]:
+                bar["maximum"] = state["total"]
+                bar["value"] = state["done"]
+                status.config(text=f"Encoding images: {state['done']}/{state['total']}")
+            if worker.is_alive():
+                self.root.after(100, poll)
+                return
+
+            top.destroy()
+            report = state["report"]
+            if report is None or not report.saved:
+                self._msg("error", "Bulk Enrollment", state["error"] or "Database update failed; no students were saved.")
+                return
+            self.load_global_data()
+            self.refresh_student_list_for_group()
+            lines = [report.summary()]
+            lines += [f"{os.path.basename(p or '?')}: {reason}" for p, reason in report.failures[:15]]
+            if len(report.failures) > 15:
+                lines.append(f"... and {len(report.failures) - 15} more")
+            self._msg("info", "Bulk Enrollment", "\n".join(lines))
+
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        poll()
+
     # Delete the selected student from the database.
     # 1) Ensure a student is selected in the Treeview.
     # 2) Ask for confirmation.
@@ -582,7 +742,6 @@ class AutoAttendApp:
         if messagebox.askyesno("Confirm", "Remove this student from the group?"):
             self.db.delete_student(student_id)
             self.refresh_student_list_for_group()
-            self.load_global_data()
 
     # --- ACADEMIC / TIMETABLE TAB ---
     # Create the Admin "Academic" tab UI.
@@ -592,7 +751,6 @@ class AutoAttendApp:
     # - Editing the timetable slots for a group
     # Timetable slots later define whether a session is "active" during live attendance scanning.
     def _build_admin_academic_tab(self, parent):
-        self.db.init_teacher_group_link()
         frame = ttk.Frame(parent, padding="10")
         frame.pack(fill="both", expand=True)
         
@@ -801,10 +959,12 @@ class AutoAttendApp:
         vid_frame = ttk.LabelFrame(left, text="Live Camera", padding=5)
         vid_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
         
+        from PIL import Image, ImageTk
         self.video_label = ttk.Label(vid_frame)
         self.video_label.pack(fill=tk.BOTH, expand=True)
         self.video_label.image = ImageTk.PhotoImage(Image.new("RGB", (640, 480), "gray"))
         self.video_label.configure(image=self.video_label.image)
+        self._shown_seq = 0  # new label: show the current frame again
         
         btn_box = ttk.Frame(left)
         btn_box.pack(fill=tk.X)
@@ -836,7 +996,7 @@ class AutoAttendApp:
         self.tree_att.tag_configure('ABSENT', foreground='red', background='#FFEBEE')
         self.tree_att.bind("<Double-1>", self.on_live_list_double_click)
         
-        self.check_schedule()
+        self.check_schedule(resume=True)
         self.update_video_loop()
 
     def on_live_list_double_click(self, event):
@@ -853,6 +1013,7 @@ class AutoAttendApp:
         if student_id:
             group_id = self.active_session['group_id']
             new_status = self.db.toggle_attendance_status(student_id, group_id)
+            self.session_attendance.add(student_id)  # a row exists now either way; don't auto-mark over it
             self.tree_att.set(item_id, "status", new_status)
             self.tree_att.item(item_id, tags=(new_status,))
 
@@ -976,15 +1137,23 @@ class AutoAttendApp:
     # Converts the selected group name into a group_id, then calls DatabaseManager.get_active_session_info().
     # If a session is active, store it in self.session_info so live scanning knows which session to record.
     # If not active, warn the user that scanning can be tested but attendance will not be recorded.
-    def check_schedule(self):
+    def check_schedule(self, resume=False):
         session = self.db.get_active_session_info(self.current_user['id'])
+        if self.active_session and (not session or session['id'] != self.active_session['id']):
+            self._clear_snapshot()  # the previous timetable slot is over
         if session:
             self.active_session = session
+            if self.vision is not None:
+                self.vision.set_active_group(session['group_id'])
             self.lbl_group.config(text=f"Active Group: {session['group_name']}", font=("Helvetica", 12, "bold"))
             self.lbl_status.config(text="Status: Ready", foreground="orange")
             self.refresh_att_list()
+            if resume and not self.is_session_active:
+                self._restore_snapshot()
         else:
             self.active_session = None
+            if self.vision is not None:
+                self.vision.set_active_group(None)
             self.lbl_group.config(text="No active class")
             self.lbl_status.config(text="Status: Off Duty", foreground="gray")
             for i in self.tree_att.get_children(): self.tree_att.delete(i)
@@ -992,15 +1161,32 @@ class AutoAttendApp:
     # Start live scanning for the selected group.
     # 1) Store the chosen group context (id/name).
     # 2) Ensure session_info is set (either from a prior schedule check or by checking now).
-    # 3) Create CameraManager and start its capture thread.
-    # 4) Set camera_running True and begin the UI update loop (update_video_loop).
+    # 3) If the face models are still loading (started at login), show that and retry once they are in.
+    # 4) Create CameraManager on first use (this is when the device is opened) and start its capture thread.
+    # 5) Set camera_running True and begin the UI update loop (update_video_loop).
     # If the camera is unavailable, show a clear message instead of crashing.
     def start_session_camera(self):
+        if not self.current_user:
+            return  # logged out while the models were loading
         if not self.active_session:
             messagebox.showwarning("No Class", "No class is scheduled for right now.")
             return
+        if not self._vision_ready.is_set():
+            self.btn_start['state'] = 'disabled'
+            self.lbl_status.config(text="Status: Loading face models...", foreground="orange")
+            self._when_vision_ready(self.start_session_camera)
+            return
         try:
+            vision = self._require_vision()
+            if self.camera is None:
+                from src.hardware import CameraManager
+                self.camera = CameraManager()
+                self.recognition_worker = RecognitionWorker(self.camera, vision)
+            # Only this class's students are candidates while the session runs
+            vision.set_active_group(self.active_session['group_id'])
             self.camera.start()
+            self.recognition_worker.start()
+            self.attendance_writer.start()
             self.btn_start['state'] = 'disabled'
             self.btn_stop['state'] = 'normal'
             self.is_session_active = True
@@ -1011,6 +1197,8 @@ class AutoAttendApp:
 
             self.lbl_status.config(text="Status: Active Session", foreground="green")
         except Exception as e:
+            self.btn_start['state'] = 'normal'
+            self.lbl_status.config(text="Status: Ready", foreground="orange")
             messagebox.showerror("Error", str(e))
 
 
@@ -1024,20 +1212,95 @@ class AutoAttendApp:
         students = self.db.get_students_by_group(gid)
         
         att_data = self.db.get_todays_attendance(gid)
+        self.session_attendance = set(att_data)
         
         for s in students:
             status = att_data.get(s.id, "ABSENT")
             iid = self.tree_att.insert("", "end", values=(s.name, status), tags=(status,))
             self.student_tree_map[s.id] = iid
 
+    # Write the live session to the snapshot file (see src/snapshot.py).
+    # Called every snapshot_interval seconds from update_video_loop and again when the camera stops,
+    # so the file never lags the session by more than a couple of seconds.
+    def _save_snapshot(self, camera_running):
+        self._snapshot_due = time.time() + self.snapshot_interval
+        if not self.current_user or not self.active_session:
+            return
+        try:
+            self.snapshot.save(
+                self.current_user['id'],
+                self.active_session,
+                self.session_attendance,
+                tracks=self.vision.export_tracks() if camera_running else (),
+                gallery_generation=self.vision.gallery.generation(),
+                camera_running=camera_running,
+            )
+        except (OSError, ValueError) as e:
+            print(f"Session snapshot not saved: {e}")
+
+    # Delete the snapshot once the session it describes has ended normally.
+    # Kept while the AttendanceWriter still holds unsaved sightings: the snapshot is their only other copy,
+    # and the next login for that slot writes them from it.
+    def _clear_snapshot(self):
+        if self.attendance_writer.telemetry()['queue_depth']:
+            return
+        self.snapshot.clear()
+
+    # Resume the session the app was running before it was closed or crashed.
+    # Only a snapshot from today, for this teacher and this timetable slot is used.
+    # Students it had marked whose rows never reached SQLite (writer queue lost in a crash) are written now.
+    # If the camera was running moments ago, then as soon as the face models have loaded the tracker gets
+    # its identified faces back (same gallery generation only) and scanning restarts, so names show on
+    # the first frames.
+    def _restore_snapshot(self):
+        snap = self.snapshot.load()
+        if not snap or snap['teacher_id'] != self.current_user['id']:
+            return
+        if snap['day'] != datetime.now().strftime("%Y-%m-%d") or snap['session'].get('id') != self.active_session['id']:
+            return
+
+        gid = self.active_session['group_id']
+        lost = [sid for sid in snap['present'] if sid in self.student_tree_map and sid not in self.session_attendance]
+        if lost:
+            try:
+                for sid in self.db.mark_attendance_many([(sid, gid) for sid in lost]):
+                    self.session_attendance.add(sid)
+                    self.tree_att.set(self.student_tree_map[sid], "status", "PRESENT")
+                    self.tree_att.item(self.student_tree_map[sid], tags=('PRESENT',))
+            except Exception as e:
+                print(f"Could not restore snapshot attendance: {e}")
+
+        if not snap['camera_running'] or time.time() - snap['saved_at'] > self.snapshot_max_age:
+            return
+        session_id = self.active_session['id']
+
+        def resume():
+            if self.vision is None or self.is_session_active:
+                return
+            if not self.active_session or self.active_session['id'] != session_id:
+                return  # logged out / schedule changed while the models loaded
+            if snap['gallery_generation'] == self.vision.gallery.generation():
+                self.vision.set_active_group(gid)  # first: switching groups clears the tracks
+                self.vision.restore_tracks(snap['tracks'])
+            self.start_session_camera()
+
+        self._when_vision_ready(resume)
+
     # Stop the live camera feed safely.
     # Signals the CameraManager to stop its background capture loop and releases camera resources.
     # Updates state flags so update_video_loop stops scheduling itself.
     # This method demonstrates UI responsiveness while scanning (threading success criterion).
     def stop_camera(self):
-        if hasattr(self, 'camera'):
+        # Stop the consumer before the producer so the worker never reads a released device
+        if self.recognition_worker is not None:
+            self.recognition_worker.stop()
+        if self.camera is not None:
             self.camera.stop()
+        # Commit every queued sighting before the session counts as stopped
+        self.attendance_writer.stop()
 
+        if self.is_session_active:
+            self._save_snapshot(camera_running=False)  # paused on purpose: don't auto-restart it
         self.is_session_active = False
 
         # Freeze FPS
@@ -1056,19 +1319,35 @@ class AutoAttendApp:
 
     # Main UI loop for live video processing (runs repeatedly via root.after()).
     # Each cycle:
-    # 1) Pull the latest frame from CameraManager (non-blocking because capture is threaded).
+    # 1) Lease the latest frame from CameraManager's ring (non-blocking because capture is threaded) and
+    #    copy it into the reusable overlay buffer, so the camera can reuse the slot right away.
+    #    Ticks with no newly captured frame only run the PRESENT updates of step 5, so FPS counts
+    #    frames actually shown.
     # 2) Compute FPS and update the FPS label to prove smooth performance.
-    # 3) Run FaceRecognizer.detect_and_identify() to get face boxes + IDs.
+    # 3) Read the latest face boxes + IDs published by the RecognitionWorker thread
+    #    (recognition never runs here, so display FPS is not capped by dlib).
     # 4) Draw overlays (rectangles + labels) onto the frame for visual evidence.
-    # 5) If a session is active, call DatabaseManager.mark_attendance() for recognized students.
-    # 6) Convert the frame to a Tkinter-compatible image and display it.
+    # 5) If a session is active, queue recognized students on the AttendanceWriter the first
+    #    time they are seen (session_attendance filters out repeat sightings in memory); students
+    #    it has committed are shown as PRESENT.
+    # 6) Paste the overlay buffer into the label's persistent PhotoImage (see _show_overlay).
     # Using root.after keeps the UI responsive while processing continues.
     def update_video_loop(self):
         if not self.current_user or self.current_user.get('is_admin') == 1:
             return
 
-        frame = self.camera.get_frame()
-        if frame is not None:
+        draw = None
+        if self.camera is not None:
+            import cv2  # loaded by the camera already; local so app import stays light
+
+            # Only frames captured since the last one shown: no re-converting/re-pasting the same image
+            with self.camera.latest_frame(after_seq=self._shown_seq, timeout=0) as (seq, _, frame):
+                if frame is not None:
+                    self._shown_seq = seq
+                    # RGB -> RGBX into the buffer we draw on (replaces frame.copy(); X byte unused)
+                    draw = cv2.cvtColor(frame, cv2.COLOR_RGB2RGBA, dst=self._overlay_buffer(frame.shape))
+
+        if draw is not None:
             # FPS Calculation
             fps_text = self.last_fps_text
 
@@ -1080,32 +1359,78 @@ class AutoAttendApp:
                     fps_text = f"FPS: {int(fps)}"
                     self.last_fps_text = fps_text
                 self.prev_frame_time = self.new_frame_time
-            fps_text = f"FPS: {int(fps)}"
+            fps_text = f"FPS: {int(fps)} | REC: {int(self.recognition_worker.recognition_fps)}"
 
-            dets = self.vision.detect_and_identify(frame)
-            draw = frame.copy()
+            dets = self.recognition_worker.get_results()
+            confirmed = self.vision.confirmed_ids()
 
             for (sid, name, (t, r, b, l)) in dets:
                 color = (0, 255, 0) if sid else (255, 0, 0)
                 cv2.rectangle(draw, (l, t), (r, b), color, 2)
                 cv2.putText(draw, name, (l, b + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
-                if self.is_session_active and self.active_session and sid:
-                    if sid in self.student_tree_map:
+                # Only mark once the tracker has seen enough consistent votes for this student
+                if self.is_session_active and self.active_session and sid and sid in confirmed:
+                    if sid in self.student_tree_map and sid not in self.session_attendance:
                         gid = self.active_session.get('group_id', 0)
                         
-                        if self.db.mark_attendance(sid, gid):
-                            iid = self.student_tree_map[sid]
-                            self.tree_att.set(iid, "status", "PRESENT")
-                            self.tree_att.item(iid, tags=('present',))
+                        self.attendance_writer.submit(sid, gid)
+                        self.session_attendance.add(sid)  # today's row exists once the writer commits
 
             cv2.putText(draw, fps_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
-            img = ImageTk.PhotoImage(Image.fromarray(draw))
-            self.video_label.configure(image=img)
-            self.video_label.imgtk = img
+            tel = self.vision.telemetry()
+            db_tel = self.attendance_writer.telemetry()
+            cam_tel = self.camera.telemetry()
+            if "interval_ms" in tel:
+                sched_text = f"cycle {tel['cycle_ms']}ms | every {tel['interval_ms']:.0f}ms | scale {tel['scale_factor']:.2f}"
+            else:
+                sched_text = f"fixed schedule | scale {tel['scale_factor']:.2f}"  # adaptive scheduler off
+            # Writer and camera counters don't depend on the scheduler mode: always shown
+            sched_text += f" | db queue {db_tel['queue_depth']} flush {db_tel['flush_ms']}ms"
+            cam_text = (
+                f"frames {cam_tel['captured']} | dropped {cam_tel['dropped']}"
+                f" | skipped by rec {self.recognition_worker.frames_skipped}"
+                f" | lag {self.recognition_worker.frame_latency_ms:.0f}ms"
+            )
+            cv2.putText(draw, sched_text, (10, 55), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            cv2.putText(draw, cam_text, (10, 75), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            self._show_overlay()
+
+        # Every tick, new frame or not (the writer's final flush lands after the camera stops)
+        for sid in self.attendance_writer.completed():
+            iid = self.student_tree_map.get(sid)
+            if iid:
+                self.tree_att.set(iid, "status", "PRESENT")
+                self.tree_att.item(iid, tags=('PRESENT',))
+        if self.is_session_active and time.time() >= self._snapshot_due:
+            self._save_snapshot(camera_running=True)
         
         self.root.after(30, self.update_video_loop)
 
+    # Reusable RGBX frame the overlays are drawn into. The PIL image shares its memory
+    # (Image.frombuffer), so nothing is converted or allocated per frame on the Python side.
+    def _overlay_buffer(self, shape):
+        h, w = shape[:2]
+        if self._overlay is None or self._overlay.shape[:2] != (h, w):
+            import numpy as np
+            from PIL import Image
+
+            self._overlay = np.empty((h, w, 4), dtype=np.uint8)
+            self._overlay_image = Image.frombuffer("RGBX", (w, h), self._overlay, "raw", "RGBX", 0, 1)
+        return self._overlay
+
+    # Show the overlay buffer through one persistent PhotoImage: paste() updates its pixels in place,
+    # instead of creating (and registering with Tk) a new image every 30 ms.
+    def _show_overlay(self):
+        from PIL import ImageTk
+
+        photo = self.video_label.image
+        if (photo.width(), photo.height()) != self._overlay_image.size:
+            photo = ImageTk.PhotoImage("RGB", self._overlay_image.size)
+            self.video_label.configure(image=photo)
+            self.video_label.image = photo
+        photo.paste(self._overlay_image)
+
     # Export the current session's attendance to a CSV file.
     # Fetches the session attendance rows from SQLite, then asks the user where to save the CSV.
     # Writes a human-readable file that can be opened in Excel for administration use.
@@ -1136,5 +1461,12 @@ class AutoAttendApp:
             messagebox.showerror("Error", f"Export failed: {str(e)}")
 
     def on_close(self):
+        # Closing the window mid-lesson is a restart, not a pause: resume scanning next time
+        resume = self.is_session_active
         self.stop_camera()
+        if resume:
+            self._save_snapshot(camera_running=True)
+        if self.vision is not None:
+            self.vision.close()
+        self.db.close()
         self.root.destroy()
\ No newline at end of file
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+
+
+class AttendanceWriter:
+    """
+    Write-behind queue for attendance inserts.
+
+    The Tk thread only appends (student_id, group_id) to an in-memory list; a
+    background thread commits everything that arrived within `interval` seconds
+    as one transaction, so a slow disk (network-mounted profile) stalls this
+    thread instead of the video. Students that were actually inserted come back
+    through completed() for the UI to show as present.
+    """
+
+    def __init__(self, db, interval=0.25, max_batch=500):
+        self.db = db
+        self.interval = interval      # seconds a batch stays open for more sightings
+        self.max_batch = max_batch    # commit early once this many are waiting
+
+        self._cond = threading.Condition()
+        self._pending = []
+        self._in_flight = 0
+        self._flush_requested = False
+        self._completed = deque()     # inserted student ids, drained by the UI thread
+
+        self.running = False
+        self.thread = None
+        self._thread_live = False     # thread still inside _run (it can outlive a timed-out stop)
+
+        # Telemetry
+        self.last_flush_ms = 0.0
+        self.flush_ms = 0.0           # smoothed batch commit time
+        self.written = 0
+        self.failed_flushes = 0
+
+    def start(self):
+        with self._cond:
+            if self.running:
+                return
+            self.running = True
+            if self._thread_live:
+                # The last stop() timed out mid-write: that thread carries on, never start a second one
+                self._cond.notify_all()
+                return
+            self._thread_live = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """
+        Flush everything queued, then end the thread. If the database doesn't
+        answer within timeout, unsent sightings stay queued for the next
+        start()/flush() (and are in the session snapshot).
+        """
+        if not self.running:
+            self.flush(timeout)
+            return
+        self.flush(timeout)
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            if not self.thread.is_alive():
+                self.thread = None  # else still finishing one write; start() picks it up again
+        with self._cond:
+            queued = len(self._pending) + self._in_flight
+        if queued:
+            print(f"Attendance writer: {queued} sightings not saved yet, kept for the next flush")
+
+    def submit(self, student_id, group_id):
+        """Queue a first sighting (never blocks on the database)."""
+        with self._cond:
+            self._pending.append((student_id, group_id))
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self, timeout=5.0):
+        """Block until everything submitted so far is committed. Returns False on timeout."""
+        if not self.running:
+            # No writer thread: commit on the caller's thread
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if batch and not self._write(batch):
+                with self._cond:
+                    self._pending[:0] = batch
+                return False
+            return True
+
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+            self._flush_requested = False
+            return done
+
+    def completed(self):
+        """Student ids inserted since the last call (UI thread)."""
+        out = []
+        while self._completed:
+            out.append(self._completed.popleft())
+        return out
+
+    def telemetry(self):
+        with self._cond:
+            depth = len(self._pending) + self._in_flight
+        return {
+            "queue_depth": depth,
+            "last_flush_ms": round(self.last_flush_ms, 1),
+            "flush_ms": round(self.flush_ms, 1),
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or not self.running)
+                if not self.running:
+                    # stop() already flushed; anything left (locked database) stays in _pending
+                    self._thread_live = False
+                    return
+                # Keep the batch open briefly so sightings close together share one commit
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.max_batch or self._flush_requested or not self.running,
+                    self.interval,
+                )
+                batch, self._pending = self._pending, []
+                self._in_flight = len(batch)
+
+            ok = self._write(batch)
+
+            with self._cond:
+                if not ok:
+                    self._pending[:0] = batch  # retry with the next batch
+                self._in_flight = 0
+                self._cond.notify_all()
+            if not ok:
+                time.sleep(self.interval)  # don't spin on a locked/unreachable database
+
+    def _write(self, batch):
+        t0 = time.perf_counter()
+        try:
+            inserted = self.db.mark_attendance_many(batch)
+        except Exception as e:
+            self.failed_flushes += 1
+            print(f"Attendance writer error: {e}")
+            return False
+
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.last_flush_ms = ms
+        self.flush_ms = ms if self.flush_ms == 0 else 0.8 * self.flush_ms + 0.2 * ms
+        self.written += len(inserted)
+        self._completed.extend(inserted)
+        return True
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+def file_sha1(path):
+    """Hex SHA-1 of a file's bytes (the cache key: renamed/copied photos still hit)."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class EncodingCache:
+    """
+    Content-addressed cache of face encodings: SHA-1 of the image bytes -> 128-d encoding.
+
+    Lives in a small SQLite sidecar next to the gallery. Results that depend only on
+    the bytes are cached too ("No face found", undecodable files), so re-uploading a
+    folder skips decoding and dlib entirely. Least-recently-used entries are evicted
+    once the cache holds more than max_entries images.
+    """
+
+    # Failures that are a property of the file itself (anything else may be transient)
+    CACHEABLE_ERRORS = ("No face found", "OpenCV could not decode image")
+
+    def __init__(self, path, max_entries=50000):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS encodings (
+                sha1 TEXT PRIMARY KEY,
+                encoding BLOB,
+                error TEXT,
+                last_used REAL NOT NULL
+            )
+        """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_encodings_last_used ON encodings(last_used)")
+        conn.commit()
+        conn.close()
+
+    def get_many(self, keys):
+        """{sha1: (encoding or None, error or None)} for the keys that are cached."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found = {}
+        conn = sqlite3.connect(self.path)
+        try:
+            for a in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+                chunk = keys[a:a + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(f"SELECT sha1, encoding, error FROM encodings WHERE sha1 IN ({marks})", chunk)
+                for sha1, blob, error in rows:
+                    enc = np.frombuffer(blob, dtype=np.float64).copy() if blob is not None else None
+                    found[sha1] = (enc, error)
+            if found:
+                now = time.time()
+                conn.executemany("UPDATE encodings SET last_used=? WHERE sha1=?", [(now, k) for k in found])
+                conn.commit()
+        finally:
+            conn.close()
+        return found
+
+    def put_many(self, items):
+        """items: [(sha1, encoding or None, error or None)]. Non-cacheable failures are ignored."""
+        rows = []
+        now = time.time()
+        for sha1, enc, error in items:
+            if enc is not None:
+                rows.append((sha1, np.asarray(enc, dtype=np.float64).tobytes(), None, now))
+            elif error in self.CACHEABLE_ERRORS:
+                rows.append((sha1, None, error, now))
+        if not rows:
+            return
+
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.executemany("INSERT OR REPLACE INTO encodings (sha1, encoding, error, last_used) VALUES (?, ?, ?, ?)", rows)
+            (count,) = conn.execute("SELECT COUNT(*) FROM encodings").fetchone()
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM encodings WHERE sha1 IN (SELECT sha1 FROM encodings ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            conn.commit()
+        finally:
+            conn.close()
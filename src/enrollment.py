@@ -0,0 +1,221 @@
+"""
+Bulk enrollment: register a whole folder of students in one go.
+
+Expected layout (one folder per student, named by roll number, optionally
+followed by the student's name):
+
+    photos/
+        1001_Jane_Doe/  img1.jpg img2.jpg ...
+        1002_John_Smith/ ...
+        1003/            (name defaults to the roll number for new students)
+
+Usage:
+    python -m src.enrollment photos --group CS-SL-26-1 [--workers 8]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.encoding_cache import file_sha1
+from src.persistence import DatabaseManager
+from src.vision import FaceRecognizer, encode_image_file
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def _encode_job(path):
+    # Runs in a worker process; returns the path so results can arrive in any order
+    enc, error = encode_image_file(path)
+    return path, enc, error
+
+
+def scan_folder(root):
+    """[(roll_number, name or None, [image paths]), ...] for every student folder under root."""
+    people = []
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        roll, _, name = entry.name.partition("_")
+        if not roll.strip():
+            continue
+        images = sorted(
+            os.path.join(dirpath, f)
+            for dirpath, _, files in os.walk(entry.path)
+            for f in files
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        people.append((roll.strip(), name.replace("_", " ").strip() or None, images))
+    return people
+
+
+@dataclass
+class EnrollmentReport:
+    students: int = 0                              # student folders found
+    images: int = 0                                # images found
+    cached: int = 0                                # images answered by the encoding cache
+    enrolled: list = field(default_factory=list)   # roll numbers saved with a face encoding
+    no_face: list = field(default_factory=list)    # roll numbers where no image produced an encoding
+    failures: list = field(default_factory=list)   # (image path, reason)
+    seconds: float = 0.0
+    saved: bool = False                            # False if the database transaction failed
+
+    def summary(self):
+        return (
+            f"{len(self.enrolled)}/{self.students} students enrolled from {self.images} images "
+            f"({self.cached} cached) in {self.seconds:.1f}s; {len(self.failures)} images failed, "
+            f"{len(self.no_face)} students without a usable face"
+        )
+
+
+class BulkEnroller:
+    """
+    Enrolls a folder tree of students:
+    1) decode + encode every image across a process pool (the slow part);
+       images already in the recognizer's encoding cache (same bytes) are skipped,
+    2) write each student's .npy file,
+    3) create/update all students rows in a single transaction,
+    4) write every encoding to the gallery file in one append.
+    """
+
+    def __init__(self, db, recognizer, workers=None):
+        self.db = db
+        self.recognizer = recognizer
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+
+    def enroll(self, root, group_id, progress=None):
+        """
+        progress(done, total, path, error) is called after each image (from this thread).
+        Returns an EnrollmentReport.
+        """
+        start = time.perf_counter()
+        report = EnrollmentReport()
+        people = scan_folder(root)
+        report.students = len(people)
+
+        owner = {}  # image path -> roll number
+        for roll, _, images in people:
+            for path in images:
+                owner[path] = roll
+        report.images = len(owner)
+
+        encodings = {roll: [] for roll, _, _ in people}
+        done = 0
+
+        def collect(path, enc, error):
+            nonlocal done
+            done += 1
+            if enc is not None:
+                encodings[owner[path]].append(enc)
+            else:
+                report.failures.append((path, error))
+            if progress:
+                progress(done, report.images, path, error)
+
+        # Cache hits are resolved here; only unseen image contents go to the pool
+        cache = self.recognizer.encoding_cache
+        keys = {}
+        for path in owner:
+            try:
+                keys[path] = file_sha1(path)
+            except OSError as e:
+                collect(path, None, str(e))
+        cached = cache.get_many(keys.values())
+        todo = {}  # sha1 -> paths with those bytes (identical copies are encoded once)
+        for path, key in keys.items():
+            if key in cached:
+                collect(path, *cached[key])
+                report.cached += 1
+            else:
+                todo.setdefault(key, []).append(path)
+
+        if todo:
+            fresh = []
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(_encode_job, paths[0]): key for key, paths in todo.items()}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        _, enc, error = future.result()
+                        fresh.append((key, enc, error))
+                    except Exception as e:  # worker crashed (e.g. out of memory on a huge image)
+                        enc, error = None, str(e)
+                    for path in todo[key]:
+                        collect(path, enc, error)
+            cache.put_many(fresh)
+
+        existing = {s.roll_number: s for s in self.db.get_all_students()}
+        rows, student_encs = [], {}
+        for roll, name, _ in people:
+            encs = encodings[roll]
+            if not encs:
+                report.no_face.append(roll)
+                continue
+            name = existing[roll].name if roll in existing else (name or roll)
+            path = self.recognizer.save_student_encoding(encs, name, roll)
+            rows.append((name, roll, group_id, path))
+            student_encs[roll] = np.load(path)
+
+        if rows:
+            ids = self.db.add_students_bulk(rows)
+            if ids is None:
+                report.seconds = time.perf_counter() - start
+                return report
+
+            # One pass over the gallery file: tombstone re-enrolled students, append everyone
+            gallery = self.recognizer.gallery
+            gallery_ids = [ids[roll] for roll in student_encs]
+            gallery.remove(gallery_ids)
+            encs = [np.asarray(e, dtype=np.float32).reshape(-1, gallery.dim) for e in student_encs.values()]
+            row_ids = np.repeat(gallery_ids, [len(e) for e in encs])
+            gallery.append(row_ids, np.vstack(encs))
+            report.enrolled = list(student_encs)
+
+        report.saved = True
+        report.seconds = time.perf_counter() - start
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enroll a folder of students (one sub-folder per roll number).")
+    parser.add_argument("folder")
+    parser.add_argument("--group", required=True, help="group for new students, e.g. CS-SL-26-1 (created if missing; existing students keep theirs)")
+    parser.add_argument("--workers", type=int, default=0, help="encoding processes (default: all cores)")
+    parser.add_argument("--db", default="data/attendance.db")
+    parser.add_argument("--encodings", default="data/encodings")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"Not a folder: {args.folder}")
+        return 1
+
+    db = DatabaseManager(args.db)
+    group = db.get_group_by_name(args.group)
+    if group is None:
+        db.add_group(args.group)
+        group = db.get_group_by_name(args.group)
+
+    enroller = BulkEnroller(db, FaceRecognizer(args.encodings), args.workers)
+
+    def progress(done, total, path, error):
+        if error:
+            print(f"\n  {path}: {error}")
+        print(f"\rEncoding images: {done}/{total}", end="", flush=True)
+
+    report = enroller.enroll(args.folder, group.id, progress)
+    print()
+    if not report.saved:
+        print("Database update failed; no students were saved.")
+        return 1
+    print(report.summary())
+    for roll in report.no_face:
+        print(f"  no usable face: {roll}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
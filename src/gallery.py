@@ -0,0 +1,142 @@
+import os
+import struct
+
+import numpy as np
+
+
+class GalleryStore:
+    """
+    Single-file face gallery: every enrolled encoding in one memory-mappable file.
+
+    Layout (little-endian):
+        header (64 bytes): magic, format version, dim, record count, generation
+        records:           count x (int64 student_id, float32[dim] encoding)
+
+    Records are fixed-size, so the file maps straight onto a NumPy structured
+    array with no parsing: load() returns the id column and a (N, dim) float32
+    view of the encodings (rows 520 bytes apart, which BLAS handles directly).
+    Appends go to the end of the file and only then bump the header count, so a
+    crash mid-write leaves the previous gallery intact. Removed students are
+    tombstoned in place (id = -1) and dropped by compact().
+    """
+
+    MAGIC = b"AAGALLRY"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIIQQ")  # magic, version, dim, count, generation
+    HEADER_SIZE = 64
+    TOMBSTONE = -1
+
+    def __init__(self, path, dim=128):
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype([("id", "<i8"), ("enc", "<f4", (dim,))])
+
+    # --- Header ---
+    def _read_header(self, f):
+        raw = f.read(self.HEADER.size)
+        if len(raw) < self.HEADER.size:
+            raise ValueError("truncated gallery header")
+        magic, version, dim, count, generation = self.HEADER.unpack(raw)
+        if magic != self.MAGIC or version != self.VERSION or dim != self.dim:
+            raise ValueError(f"unsupported gallery file (version {version}, dim {dim})")
+        return count, generation
+
+    def _write_header(self, f, count, generation):
+        f.seek(0)
+        f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.dim, count, generation).ljust(self.HEADER_SIZE, b"\0"))
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def generation(self):
+        """Bumped on every write; lets caches/snapshots detect a changed gallery."""
+        if not self.exists():
+            return 0
+        with open(self.path, "rb") as f:
+            return self._read_header(f)[1]
+
+    # --- Read ---
+    def load(self):
+        """
+        Memory-maps the gallery (zero-copy).
+        Returns (ids int64 (N,), encodings float32 (N, dim)); tombstones included.
+        """
+        if not self.exists():
+            return np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32)
+
+        with open(self.path, "rb") as f:
+            count, _ = self._read_header(f)
+        if count == 0:
+            return np.empty(0, dtype=np.int64), np.empty((0, self.dim), dtype=np.float32)
+
+        records = np.memmap(self.path, dtype=self.dtype, mode="r", offset=self.HEADER_SIZE, shape=(count,))
+        return records["id"], records["enc"]
+
+    # --- Write ---
+    def append(self, student_ids, encodings):
+        """Append one record per (student_id, encoding) row."""
+        encodings = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        student_ids = np.asarray(student_ids, dtype=np.int64).reshape(-1)
+        if student_ids.shape[0] != encodings.shape[0]:
+            raise ValueError("student_ids and encodings must have the same length")
+        if not len(student_ids):
+            return
+
+        records = np.empty(len(student_ids), dtype=self.dtype)
+        records["id"] = student_ids
+        records["enc"] = encodings
+
+        if not self.exists():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "wb") as f:
+                self._write_header(f, 0, 0)
+
+        with open(self.path, "r+b") as f:
+            count, generation = self._read_header(f)
+            f.seek(self.HEADER_SIZE + count * self.dtype.itemsize)
+            f.write(records.tobytes())
+            f.flush()
+            self._write_header(f, count + len(records), generation + 1)
+
+    def remove(self, student_ids):
+        """Tombstone every record of one student (or an iterable of students). Returns how many were removed."""
+        ids, _ = self.load()
+        rows = np.flatnonzero(np.isin(ids, np.asarray(student_ids, dtype=np.int64)))
+        del ids
+        if not rows.size:
+            return 0
+
+        with open(self.path, "r+b") as f:
+            count, generation = self._read_header(f)
+            tomb = struct.pack("<q", self.TOMBSTONE)
+            for r in rows.tolist():
+                f.seek(self.HEADER_SIZE + r * self.dtype.itemsize)
+                f.write(tomb)
+            self._write_header(f, count, generation + 1)
+        return int(rows.size)
+
+    def compact(self, min_dead_fraction=0.25):
+        """
+        Rewrite without tombstones once enough records are dead. Must run while
+        nothing maps the file (Windows can't replace a mapped file), i.e. before load().
+        """
+        ids, encs = self.load()
+        dead = int(np.count_nonzero(ids == self.TOMBSTONE))
+        if not len(ids) or dead < min_dead_fraction * len(ids):
+            return False
+
+        keep = ids != self.TOMBSTONE
+        kept_ids, kept_encs = np.array(ids[keep]), np.array(encs[keep])
+        generation = self.generation()
+        del ids, encs
+
+        tmp = self.path + ".tmp"
+        records = np.empty(len(kept_ids), dtype=self.dtype)
+        records["id"] = kept_ids
+        records["enc"] = kept_encs
+        with open(tmp, "wb") as f:
+            self._write_header(f, len(records), generation + 1)
+            f.seek(self.HEADER_SIZE)
+            f.write(records.tobytes())
+        os.replace(tmp, self.path)
+        return True
@@ -1,34 +1,60 @@
 import cv2
+import numpy as np
 import threading
 import time
+from contextlib import contextmanager
 
 
 class CameraManager:
-    def __init__(self, camera_index=0):
-        self.camera_index = camera_index
-        self.cap = cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW)
+    """
+    Captures on a background thread into a small ring of preallocated RGB frames.
 
-        # Reduce capture load
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.read() decodes into one reused BGR buffer and cvtColor writes the RGB
+    result straight into the next free ring slot, so steady-state capture
+    allocates nothing per frame. Every frame gets a monotonic sequence number
+    and a capture timestamp. Readers wait for a frame newer than the one they
+    last saw with get_latest(after_seq) (a condition variable, no polling) and
+    lease its slot; the capture thread never overwrites a leased slot or the
+    newest one, so a frame can't change under the recognizer mid-cycle.
 
-        # If supported, reduce buffering (prevents “lag behind real time”)
-        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    Counters: captured (frames read from the device), consumed (frames handed
+    to at least one reader), dropped (frames replaced before any reader took
+    them, or with no free slot to go into).
+    """
+
+    def __init__(self, camera_index=0, ring_size=4, max_fps=60.0):
+        self.camera_index = camera_index
+        self.ring_size = ring_size  # >= concurrent readers + 2 (newest frame + the one being written)
+        self.max_fps = max_fps      # only paces backends whose read() returns without waiting for a frame
+        self.cap = None  # the device is opened by start(), not at construction
 
-        self.current_frame = None
         self.running = False
         self.lock = threading.Lock()
+        self._frame_ready = threading.Condition(self.lock)  # notified on every new frame and on stop
         self.thread = None
 
+        # Ring state (guarded by lock); buffers are allocated once the frame size is known
+        self._frames = []
+        self._seqs = []      # sequence number of the frame in each slot
+        self._stamps = []    # capture time (time.monotonic) of the frame in each slot
+        self._holds = []     # readers currently using each slot
+        self._taken = []     # slot's frame has been handed to a reader
+        self._latest = -1    # slot of the newest frame
+        self._seq = 0
+
+        # Telemetry
+        self.captured = 0
+        self.consumed = 0
+        self.dropped = 0
+
     def start(self):
         """Starts the camera thread. Raises RuntimeError if camera is unavailable."""
         if self.running:
             return
 
         # 1. Attempt to open the camera
-        if not self.cap.isOpened():
-            self.cap = cv2.VideoCapture(self.camera_index)
+        if self.cap is None or not self.cap.isOpened():
+            self.cap = self._open()
 
         # 2. Did the driver acknowledge the device?
         if not self.cap.isOpened():
@@ -51,11 +77,27 @@ class CameraManager:
         self.thread = threading.Thread(target=self._capture_loop, daemon=True)
         self.thread.start()
 
+    def _open(self):
+        cap = cv2.VideoCapture(self.camera_index, cv2.CAP_DSHOW)
+        if not cap.isOpened():
+            cap = cv2.VideoCapture(self.camera_index)  # backend default (non-Windows)
+
+        # Reduce capture load
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        cap.set(cv2.CAP_PROP_FPS, 30)
+
+        # If supported, reduce buffering (prevents “lag behind real time”)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
     def stop(self):
-        self.running = False
+        with self._frame_ready:
+            self.running = False
+            self._frame_ready.notify_all()  # wake readers blocked in get_latest
         if self.thread:
             self.thread.join()
-        if self.cap.isOpened():
+        if self.cap is not None and self.cap.isOpened():
             self.cap.release()
 
     def _capture_loop(self):
@@ -63,20 +105,107 @@ class CameraManager:
         Continuous loop running on a separate thread.
         Decouples hardware latency (camera reads) from the UI rendering loop.
         """
+        raw = None
+        min_interval = 1.0 / self.max_fps
+        last = 0.0
         while self.running:
-            ret, frame = self.cap.read()
-            if ret:
-                # Convert BGR (OpenCV standard) to RGB (UI standard)
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # read() blocks until the device has the next frame, so no fixed sleep is needed
+            ret, frame = self.cap.read(raw)  # decodes into the same BGR buffer once it exists
+            now = time.monotonic()
+            if not ret:
+                time.sleep(0.01)  # device hiccup: don't spin
+                continue
+            raw = frame
+
+            with self.lock:
+                self.captured += 1
+                slot = self._writable_slot(raw.shape)
+                if slot is None:
+                    self.dropped += 1
+            if slot is not None:
+                # Convert BGR (OpenCV standard) to RGB (UI standard), straight into the ring
+                cv2.cvtColor(raw, cv2.COLOR_BGR2RGB, dst=self._frames[slot])
+                with self._frame_ready:
+                    self._publish(slot, now)
+
+            # Backends (and video files) that return immediately are capped at max_fps
+            wait = min_interval - (time.monotonic() - last)
+            last = now
+            if wait > 0:
+                time.sleep(wait)
+
+    def _writable_slot(self, shape):
+        """Next ring slot that is neither the newest frame nor leased (None: all busy, drop this frame)."""
+        h, w = shape[:2]
+        if not self._frames or self._frames[0].shape[:2] != (h, w):
+            # First frame or resolution change; readers keep their old arrays alive until released
+            self._frames = [np.empty((h, w, 3), dtype=np.uint8) for _ in range(self.ring_size)]
+            self._seqs = [0] * self.ring_size
+            self._stamps = [0.0] * self.ring_size
+            self._holds = [0] * self.ring_size
+            self._taken = [False] * self.ring_size
+            self._latest = -1
+
+        n = len(self._frames)
+        for k in range(1, n + 1):
+            i = (self._latest + k) % n
+            if i != self._latest and self._holds[i] == 0:
+                return i
+        return None
 
-                # Acquire lock before writing to shared memory
-                with self.lock:
-                    self.current_frame = frame_rgb
+    def _publish(self, slot, stamp):
+        """Make slot the newest frame (lock held) and wake waiting readers."""
+        if self._latest >= 0 and not self._taken[self._latest]:
+            self.dropped += 1  # replaced before anyone read it
+        self._seq += 1
+        self._seqs[slot] = self._seq
+        self._stamps[slot] = stamp
+        self._taken[slot] = False
+        self._latest = slot
+        self._frame_ready.notify_all()
+
+    def get_latest(self, after_seq=0, timeout=None):
+        """
+        Lease the newest frame with a sequence number above after_seq:
+        (seq, capture_time, frame). Waits up to timeout seconds for one
+        (None = until a frame arrives or the camera stops, 0 = don't wait);
+        returns (0, 0.0, None) if there is none. The slot is not reused until
+        release_frame(frame); prefer the latest_frame() context manager.
+        """
+        with self._frame_ready:
+            if timeout != 0:
+                self._frame_ready.wait_for(lambda: self._seq > after_seq or not self.running, timeout)
+            i = self._latest
+            if i < 0 or self._seqs[i] <= after_seq:
+                return 0, 0.0, None
+            self._holds[i] += 1
+            if not self._taken[i]:
+                self._taken[i] = True
+                self.consumed += 1
+            return self._seqs[i], self._stamps[i], self._frames[i]
+
+    def release_frame(self, frame):
+        with self.lock:
+            for i, f in enumerate(self._frames):
+                if f is frame:
+                    self._holds[i] -= 1
+                    return
 
-            # Sleep 10ms to prevent CPU core saturation
-            time.sleep(0.01)
+    @contextmanager
+    def latest_frame(self, after_seq=0, timeout=None):
+        """with camera.latest_frame(...) as (seq, capture_time, frame): -- see get_latest."""
+        seq, stamp, frame = self.get_latest(after_seq, timeout)
+        try:
+            yield seq, stamp, frame
+        finally:
+            if frame is not None:
+                self.release_frame(frame)
 
-    def get_frame(self):
-        """Thread-safe accessor for the latest frame."""
+    def telemetry(self):
         with self.lock:
-            return self.current_frame
+            return {
+                "captured": self.captured,
+                "consumed": self.consumed,
+                "dropped": self.dropped,
+                "latest_seq": self._seq,
+            }
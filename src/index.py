@@ -0,0 +1,234 @@
+import numpy as np
+
+
+def _sq_dists(queries, matrix, sq_norms):
+    """Squared euclidean distances (M,N) via ||a||^2 + ||b||^2 - 2ab."""
+    d2 = queries @ matrix.T
+    d2 *= -2.0
+    d2 += sq_norms[None, :]
+    d2 += np.einsum("ij,ij->i", queries, queries)[:, None]
+    np.maximum(d2, 0.0, out=d2)  # rounding can push exact matches slightly negative
+    return d2
+
+
+def _top_k(d2, k):
+    """Column indices of the k smallest values per row, sorted ascending."""
+    k = max(1, min(int(k), d2.shape[1]))
+    if k == 1:
+        return np.argmin(d2, axis=1)[:, None]
+    idx = np.argpartition(d2, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(d2, idx, axis=1), axis=1)
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def _segments(labels):
+    """
+    (order, starts) grouping gallery rows by label (student) for segment reductions,
+    or None when every label is unique (one row per student: rows are the segments).
+    """
+    if labels is None:
+        return None
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    if len(starts) == len(labels):
+        return None
+    return order, starts
+
+
+def select_templates(encodings, k=5, iters=10):
+    """
+    Pick at most k representative encodings (k-medoids) from one student's photos.
+
+    Medoids are real encodings, so each template is an actual pose/lighting the
+    student was photographed in rather than an average that matches none of them.
+    Farthest-first seeding spreads the initial picks over the variation.
+    """
+    x = np.asarray(encodings, dtype=np.float64)
+    x = x.reshape(-1, x.shape[-1])
+    n = x.shape[0]
+    if n <= k:
+        return x
+
+    d = np.sqrt(_sq_dists(x, x, np.einsum("ij,ij->i", x, x)))
+    medoids = [int(np.argmin(d.sum(axis=1)))]
+    while len(medoids) < k:
+        medoids.append(int(np.argmax(d[:, medoids].min(axis=1))))
+
+    for _ in range(iters):
+        assign = np.argmin(d[:, medoids], axis=1)
+        new = []
+        for c, old in enumerate(medoids):
+            members = np.flatnonzero(assign == c)
+            if not members.size:
+                new.append(old)
+                continue
+            new.append(int(members[np.argmin(d[np.ix_(members, members)].sum(axis=1))]))
+        if new == medoids:
+            break
+        medoids = new
+    return x[sorted(set(medoids))]
+
+
+class FlatIndex:
+    """
+    Exact brute-force search over the whole gallery (best for small/medium galleries).
+
+    With labels (student id per row, several templates per student) results are
+    per label: each label's distance is the min over its rows (segment-min), and
+    the returned index is the row of its closest template.
+    """
+
+    kind = "flat"
+
+    def __init__(self, matrix, labels=None):
+        self.matrix = matrix
+        self.sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+        self._segments = _segments(labels)
+
+    @property
+    def size(self):
+        return self.matrix.shape[0]
+
+    def search(self, queries, k=1):
+        """Returns (indices, distances), both (M,k), rows of the gallery sorted by distance."""
+        queries = np.asarray(queries, dtype=self.matrix.dtype)  # avoid upcasting the whole gallery
+        d2 = _sq_dists(queries, self.matrix, self.sq_norms)
+        if k == 1 or self._segments is None:
+            # The nearest row is also the nearest label, so k=1 needs no reduction
+            idx = _top_k(d2, k)
+            return idx, np.sqrt(np.take_along_axis(d2, idx, axis=1))
+
+        order, starts = self._segments
+        seg = np.minimum.reduceat(d2[:, order], starts, axis=1)  # (M, labels): best template each
+        top = _top_k(seg, k)
+        ends = np.r_[starts[1:], len(order)]
+        idx = np.empty_like(top)
+        for i, j in np.ndindex(*top.shape):
+            rows = order[starts[top[i, j]]:ends[top[i, j]]]
+            idx[i, j] = rows[np.argmin(d2[i, rows])]
+        return idx, np.sqrt(np.take_along_axis(seg, top, axis=1))
+
+
+class IVFIndex:
+    """
+    Inverted-file index: k-means partitions the gallery into n_lists cells and a
+    query is compared only against the rows of its n_probe closest cells.
+
+    Approximate: a true nearest neighbour in an unprobed cell is missed, which shows
+    up as "Unknown" rather than a wrong name as long as the threshold holds.
+    Raise n_probe to trade latency for recall (n_probe == n_lists is exact).
+    With labels, results are one row per label, like FlatIndex.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, matrix, n_lists=None, n_probe=8, iters=10, seed=0, centroids=None, labels=None):
+        n = matrix.shape[0]
+        if centroids is not None:
+            # Reuse a trained quantizer (incremental gallery updates): only re-bucket rows
+            self.n_lists = centroids.shape[0]
+        else:
+            self.n_lists = max(1, min(n, int(n_lists or round(np.sqrt(n)))))
+        self.n_probe = max(1, min(self.n_lists, int(n_probe)))
+
+        if centroids is None:
+            centroids = self._kmeans(matrix, self.n_lists, iters, seed)
+        self.centroids = centroids
+        self._centroid_norms = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        assign = self._assign(matrix, self.centroids, self._centroid_norms)
+
+        # Store rows grouped by cell so each cell is one contiguous slice
+        self._order = np.argsort(assign, kind="stable")
+        self._matrix = np.ascontiguousarray(matrix[self._order])
+        self._sq_norms = np.einsum("ij,ij->i", self._matrix, self._matrix)
+        self._offsets = np.searchsorted(assign[self._order], np.arange(self.n_lists + 1))
+
+        # Each label has at most this many rows, so k * it nearest rows always hold the k nearest labels
+        self._labels = None
+        self._max_per_label = 1
+        if _segments(labels) is not None:
+            self._labels = np.asarray(labels)[self._order]
+            self._max_per_label = int(np.unique(self._labels, return_counts=True)[1].max())
+
+    @property
+    def size(self):
+        return self._matrix.shape[0]
+
+    @staticmethod
+    def _assign(matrix, centroids, centroid_norms, chunk=8192):
+        """Nearest centroid per row (chunked to bound the temporary distance matrix)."""
+        out = np.empty(matrix.shape[0], dtype=np.int64)
+        for a in range(0, matrix.shape[0], chunk):
+            d2 = _sq_dists(matrix[a:a + chunk], centroids, centroid_norms)
+            out[a:a + chunk] = np.argmin(d2, axis=1)
+        return out
+
+    def _kmeans(self, matrix, n_lists, iters, seed):
+        rng = np.random.default_rng(seed)
+        # Train on a sample: centroids converge long before seeing the whole gallery
+        sample_n = min(matrix.shape[0], 64 * n_lists)
+        sample = matrix[rng.choice(matrix.shape[0], sample_n, replace=False)]
+
+        centroids = sample[rng.choice(sample_n, n_lists, replace=False)].astype(matrix.dtype)
+        for _ in range(iters):
+            norms = np.einsum("ij,ij->i", centroids, centroids)
+            assign = self._assign(sample, centroids, norms)
+            counts = np.bincount(assign, minlength=n_lists)
+            # Per-cell sums via one sort + reduceat (much faster than np.add.at)
+            order = np.argsort(assign, kind="stable")
+            starts = np.searchsorted(assign[order], np.arange(n_lists))
+
+            empty = counts == 0
+            sums = np.add.reduceat(sample[order], starts[~empty], axis=0)
+            centroids[~empty] = sums / counts[~empty, None]
+            # Re-seed empty cells with random sample points
+            if empty.any():
+                centroids[empty] = sample[rng.choice(sample_n, int(empty.sum()), replace=False)]
+        return centroids
+
+    def search(self, queries, k=1):
+        """Returns (indices, distances), both (M,k); missing neighbours are -1 / inf."""
+        queries = np.asarray(queries, dtype=self._matrix.dtype)
+        m = queries.shape[0]
+        out_idx = np.full((m, k), -1, dtype=np.int64)
+        out_d = np.full((m, k), np.inf)
+
+        cd2 = _sq_dists(queries, self.centroids, self._centroid_norms)
+        probes = _top_k(cd2, self.n_probe)
+        per_label = self._labels is not None and k > 1
+        fetch = k * self._max_per_label if per_label else k
+
+        for i in range(m):
+            rows = np.concatenate([
+                np.arange(self._offsets[c], self._offsets[c + 1]) for c in probes[i]
+            ])
+            if not rows.size:
+                continue
+            d2 = _sq_dists(queries[i:i + 1], self._matrix[rows], self._sq_norms[rows])
+            top = _top_k(d2, fetch)[0]
+            if per_label:
+                # Keep each label's closest row (first occurrence in ascending order)
+                _, first = np.unique(self._labels[rows[top]], return_index=True)
+                top = top[np.sort(first)[:k]]
+            out_idx[i, :top.size] = self._order[rows[top]]
+            out_d[i, :top.size] = np.sqrt(d2[0, top])
+        return out_idx, out_d
+
+
+def build_index(matrix, kind="auto", ivf_min_size=20000, labels=None, **ivf_opts):
+    """
+    Pick an index for the gallery.
+    kind: "flat" | "ivf" | "auto" (IVF once the gallery reaches ivf_min_size rows).
+    labels: optional student id per row; results then hold distinct students.
+    """
+    if matrix is None or not matrix.size:
+        return None
+    if kind == "auto":
+        kind = "ivf" if matrix.shape[0] >= ivf_min_size else "flat"
+    if kind == "ivf":
+        return IVFIndex(matrix, labels=labels, **ivf_opts)
+    if kind == "flat":
+        return FlatIndex(matrix, labels)
+    raise ValueError(f"Unknown index kind: {kind}")
@@ -0,0 +1,119 @@
+import time
+
+import cv2
+import numpy as np
+
+
+def _merge_rects(rects):
+    """Union overlapping (top, right, bottom, left) rects until none overlap."""
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        while rects:
+            t, r, b, l = rects.pop()
+            i = 0
+            while i < len(rects):
+                t2, r2, b2, l2 = rects[i]
+                if l < r2 and l2 < r and t < b2 and t2 < b:
+                    t, r, b, l = min(t, t2), max(r, r2), max(b, b2), min(l, l2)
+                    rects.pop(i)
+                    merged = True
+                else:
+                    i += 1
+            out.append((t, r, b, l))
+        rects = out
+    return rects
+
+
+class MotionRegions:
+    """
+    Picks the parts of the downscaled frame worth running HOG on.
+
+    A running-average background model is compared against each detection
+    frame; changed pixels are dilated into blobs, and boxes around existing
+    tracks are added so still faces stay covered. A full-frame scan is forced
+    every full_scan_interval seconds (and whenever the regions would cover
+    most of the frame anyway), so nothing is missed for long.
+    """
+
+    def __init__(self, diff_threshold=18, min_blob_area=12, pad=0.35, min_size=64,
+                 full_scan_interval=2.0, max_roi_fraction=0.6, alpha=0.25):
+        self.diff_threshold = diff_threshold        # grey-level change that counts as motion
+        self.min_blob_area = min_blob_area          # ignore smaller blobs (noise), in pixels
+        self.pad = pad                              # grow each region by this fraction per side
+        self.min_size = min_size                    # HOG needs some context around a face
+        self.full_scan_interval = full_scan_interval
+        self.max_roi_fraction = max_roi_fraction
+        self.alpha = alpha                          # background adaptation rate
+
+        self._bg = None
+        self._last_full = 0.0
+        self.last_fraction = 1.0  # share of the frame scanned last cycle (telemetry)
+
+    def reset(self):
+        self._bg = None
+        self._last_full = 0.0
+
+    def regions(self, small_rgb, track_boxes, now=None):
+        """
+        track_boxes: (top, right, bottom, left) in small_rgb coordinates.
+        Returns a list of regions in the same format, or None for "scan the full frame".
+        """
+        now = time.time() if now is None else now
+        h, w = small_rgb.shape[:2]
+
+        gray = cv2.cvtColor(small_rgb, cv2.COLOR_RGB2GRAY)
+        gray = cv2.GaussianBlur(gray, (3, 3), 0)
+
+        if self._bg is None or self._bg.shape != gray.shape:
+            self._bg = gray.astype(np.float32)
+            return self._full(now)
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self._bg))
+        cv2.accumulateWeighted(gray, self._bg, self.alpha)
+
+        if now - self._last_full >= self.full_scan_interval:
+            return self._full(now)
+
+        mask = (diff > self.diff_threshold).astype(np.uint8)
+        mask = cv2.dilate(mask, np.ones((5, 5), np.uint8), iterations=2)
+        n, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+
+        rects = []
+        for x, y, bw, bh, area in stats[1:n]:
+            if area >= self.min_blob_area:
+                rects.append((y, x + bw, y + bh, x))
+        for t, r, b, l in track_boxes:
+            # Optical flow can carry a box partly or fully off the frame
+            t, r, b, l = max(0, t), min(w, r), min(h, b), max(0, l)
+            if b > t and r > l:
+                rects.append((t, r, b, l))
+
+        if not rects:
+            self.last_fraction = 0.0
+            return []
+
+        rects = _merge_rects(self._grow(r, w, h) for r in rects)
+        area = sum((b - t) * (r - l) for t, r, b, l in rects)
+        if area > self.max_roi_fraction * w * h:
+            return self._full(now)
+
+        self.last_fraction = area / float(w * h)
+        return rects
+
+    def _full(self, now):
+        self._last_full = now
+        self.last_fraction = 1.0
+        return None
+
+    def _grow(self, rect, w, h):
+        t, r, b, l = rect
+        ph, pw = (b - t) * self.pad, (r - l) * self.pad
+        ph = max(ph, (self.min_size - (b - t)) / 2.0)
+        pw = max(pw, (self.min_size - (r - l)) / 2.0)
+        return (
+            int(max(0, t - ph)), int(min(w, r + pw)),
+            int(min(h, b + ph)), int(max(0, l - pw)),
+        )
@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+# --- Worker-process side ---
+# These must live at module level so they can be pickled by reference
+# (Windows uses "spawn", which re-imports this module in every worker).
+
+_worker_shm = {}  # shared memory name -> SharedMemory, attached once per worker
+
+
+def _worker_init():
+    # Import (and load dlib models) once per worker, not once per task
+    global face_recognition
+    import face_recognition
+
+
+def _attach(name):
+    shm = _worker_shm.get(name)
+    if shm is None:
+        # The parent reallocated its block: drop the stale mapping first
+        for old in _worker_shm.values():
+            old.close()
+        _worker_shm.clear()
+
+        # Workers share the parent's resource tracker (inherited under fork, passed on
+        # under spawn), so attaching only repeats the parent's registration. Leave the
+        # tracker alone: unregistering here would drop the parent's entry and its
+        # unlink() would then hit a KeyError in the tracker.
+        shm = shared_memory.SharedMemory(name=name)
+        _worker_shm[name] = shm
+    return shm
+
+
+def _encode_shard(shm_name, shape, locations):
+    """Encode a subset of faces from the frame that the parent placed in shared memory."""
+    shm = _attach(shm_name)
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    encs = face_recognition.face_encodings(frame, locations)
+    return [np.asarray(e, dtype=np.float64) for e in encs]
+
+
+# --- Parent side ---
+
+class EncodingPool:
+    """
+    Process pool that shards face encoding across CPU cores.
+
+    The frame is copied once into a shared-memory block that workers map
+    directly, so only the face boxes and the resulting 128-d vectors are
+    pickled. Results come back in the same order as the input locations.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_worker_init)
+        self._shm = None
+        self._shm_size = 0
+
+    def _frame_buffer(self, frame):
+        """Copy the frame into the shared block (reallocated only when the frame grows)."""
+        if self._shm is None or frame.nbytes > self._shm_size:
+            self._release_shm()
+            self._shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+            self._shm_size = frame.nbytes
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf)
+        view[...] = frame
+        return self._shm.name
+
+    def encode(self, frame_rgb, face_locations):
+        """Same contract as face_recognition.face_encodings(frame_rgb, face_locations)."""
+        if not face_locations:
+            return []
+
+        frame_rgb = np.ascontiguousarray(frame_rgb, dtype=np.uint8)
+        name = self._frame_buffer(frame_rgb)
+
+        # Contiguous shards keep the output order identical to the input order
+        n = min(self.workers, len(face_locations))
+        bounds = np.linspace(0, len(face_locations), n + 1).astype(int)
+        futures = [
+            self._executor.submit(_encode_shard, name, frame_rgb.shape, list(face_locations[a:b]))
+            for a, b in zip(bounds[:-1], bounds[1:])
+            if b > a
+        ]
+
+        encodings = []
+        for f in futures:
+            encodings.extend(f.result())
+        return encodings
+
+    def _release_shm(self):
+        if self._shm is not None:
+            try:
+                self._shm.close()
+                self._shm.unlink()
+            except Exception:
+                pass
+            self._shm = None
+            self._shm_size = 0
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._release_shm()
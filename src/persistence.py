@@ -1,28 +1,175 @@
 import sqlite3
 import os
 import hashlib
+import threading
 from datetime import datetime
 from src.models.entities import Student, Group, TimetableSlot
 
 
+class _PooledConnection:
+    """
+    Per-thread persistent connection handed out by DatabaseManager._connect().
+
+    Methods use it exactly like a fresh sqlite3 connection: close() discards any
+    uncommitted work (as closing a real connection would) but keeps the
+    connection, its pragmas and its prepared-statement cache for the next call.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+
 class DatabaseManager:
     def __init__(self, db_path="data/attendance.db"):
         self.db_path = db_path
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._subscribers = []
+        self._local = threading.local()  # one persistent connection per thread
         self._init_db()
 
-    # Initialize the SQLite database schema if it does not exist.
-    # Creates all required tables for:
+    # --- Connections ---
+    # Opening a connection per call costs more than the queries themselves
+    # (mark_attendance runs from the video loop), so each thread keeps one:
+    # - WAL journaling: readers don't block the writer, commits append to the log
+    # - synchronous=NORMAL: no fsync per commit in WAL mode (still crash-safe)
+    # - a larger statement cache, so repeated queries skip re-preparing the SQL
+    # sqlite3 connections may not be shared across threads, hence thread-local.
+    def _connect(self):
+        pooled = getattr(self._local, "conn", None)
+        if pooled is None:
+            conn = sqlite3.connect(self.db_path, cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            pooled = self._local.conn = _PooledConnection(conn)
+        else:
+            pooled.close()  # a previous call that raised may have left a transaction open
+        return pooled
+
+    # Close the calling thread's connection (app shutdown).
+    def close(self):
+        pooled = getattr(self._local, "conn", None)
+        if pooled is not None:
+            pooled.close()
+            pooled._conn.close()
+            self._local.conn = None
+
+    # --- Change events ---
+    # Lets in-memory caches (e.g. the FaceRecognizer gallery) patch themselves
+    # after a student edit instead of re-reading every student from disk.
+    # Events: "face_updated"(student), "student_added"(student),
+    #         "student_deleted"(student_id), "student_moved"(student_id, group_id)
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def _emit(self, event, **data):
+        for callback in self._subscribers:
+            try:
+                callback(event, **data)
+            except Exception as e:
+                print(f"Change listener error ({event}): {e}")
+
+    def get_student(self, student_id):
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT s.id, s.name, s.roll_number, s.encoding_file_path, s.group_id, g.name
+            FROM students s
+            LEFT JOIN student_groups g ON s.group_id = g.id
+            WHERE s.id=?
+        """,
+            (student_id,),
+        )
+        r = cursor.fetchone()
+        conn.close()
+        if not r:
+            return None
+        return Student(id=r[0], name=r[1], roll_number=r[2], encoding_path=r[3], group_id=r[4], group_name=r[5])
+
+    # Initialize the SQLite database on startup.
+    # 1) Bring the schema up to date with the versioned migrations below
+    #    (works for brand-new files and for existing data/attendance.db files alike).
+    # 2) Seed the default admin account and a default group so the system isn't empty.
+    # Tables (see the migrations):
     # - users (accounts + admin role)
     # - groups (class/group definitions)
     # - students (profiles + face encoding file reference)
     # - teacher_groups (many-to-many teacher assignments)
     # - timetable (schedule slots)
     # - attendance (session logs, unique per student per session)
-    # Runs on startup so the application is always ready to store persistent data.
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
+        self._migrate()
+        conn = self._connect()
         cursor = conn.cursor()
+        # Create Default Admin
+        admin_user = "admin"
+        admin_pass = self._hash_password("admin")
+        try:
+            cursor.execute(
+                "INSERT INTO users (username, password_hash, full_name, is_admin) VALUES (?, ?, ?, ?)",
+                (admin_user, admin_pass, "System Administrator", 1),
+            )
+        except sqlite3.IntegrityError:
+            pass
+
+        # Create a Default Group so system isn't empty
+        try:
+            cursor.execute(
+                "INSERT INTO student_groups (name) VALUES (?)", ("CS-SL-26-1",)
+            )
+        except:
+            pass
+
+        conn.commit()
+        conn.close()
+
+    # --- Schema migrations ---
+    # The schema version lives in the database header (PRAGMA user_version).
+    # Each step runs once, in order, inside its own transaction together with the
+    # version bump, so a failed step leaves the database at the previous version.
+    # Steps are also idempotent (IF NOT EXISTS / column checks): databases created
+    # before versioning (user_version 0) already have some of these objects.
+    # To change the schema, append a new step - never edit one that has shipped.
+    MIGRATIONS = (
+        "_migration_001_base_tables",
+        "_migration_002_teacher_groups",
+        "_migration_003_attendance_dates",
+        "_migration_004_attendance_unique_day",
+    )
+
+    def _migrate(self):
+        conn = self._connect()
+        (version,) = conn.execute("PRAGMA user_version").fetchone()
+        if version >= len(self.MIGRATIONS):
+            conn.close()
+            return
+
+        for number, name in enumerate(self.MIGRATIONS, 1):
+            # IMMEDIATE takes the write lock first, so two processes starting
+            # together (app + enrollment CLI) can't both apply the same step
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                (version,) = conn.execute("PRAGMA user_version").fetchone()
+                if version >= number:
+                    conn.rollback()
+                    continue
+                getattr(self, name)(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Database migration {number} ({name}) failed: {e}")
+                raise
+        conn.close()
+
+    def _migration_001_base_tables(self, cursor):
         # 1. Users
         cursor.execute(
             """
@@ -86,27 +233,50 @@ class DatabaseManager:
             )
         """
         )
-        # Create Default Admin
-        admin_user = "admin"
-        admin_pass = self._hash_password("admin")
-        try:
-            cursor.execute(
-                "INSERT INTO users (username, password_hash, full_name, is_admin) VALUES (?, ?, ?, ?)",
-                (admin_user, admin_pass, "System Administrator", 1),
-            )
-        except sqlite3.IntegrityError:
-            pass
 
-        # Create a Default Group so system isn't empty
-        try:
-            cursor.execute(
-                "INSERT INTO student_groups (name) VALUES (?)", ("CS-SL-26-1",)
+    def _migration_002_teacher_groups(self, cursor):
+        # Used to be created lazily by the admin Academic tab
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS teacher_groups (
+                teacher_id INTEGER,
+                group_id INTEGER,
+                PRIMARY KEY (teacher_id, group_id)
             )
-        except:
-            pass
+        """)
 
-        conn.commit()
-        conn.close()
+    # Attendance lookups are always "this student/group on this day".
+    # Filtering on date(timestamp) or timestamp LIKE 'YYYY-MM-DD%' can't use an index,
+    # so every lookup scanned the whole history. Store the local day in its own
+    # column (att_date, 'YYYY-MM-DD') and index it together with group and student.
+    # Existing rows are backfilled from their timestamp the first time this runs.
+    def _migration_003_attendance_dates(self, cursor):
+        columns = [r[1] for r in cursor.execute("PRAGMA table_info(attendance)").fetchall()]
+        if "att_date" not in columns:
+            cursor.execute("ALTER TABLE attendance ADD COLUMN att_date TEXT")
+            cursor.execute("UPDATE attendance SET att_date = substr(timestamp, 1, 10)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_group_date ON attendance(group_id, att_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_attendance_student_date ON attendance(student_id, att_date)")
+
+    # One attendance row per student, group and day, enforced by the database.
+    # Lets manual saves upsert the whole list in one statement instead of a
+    # DELETE + INSERT per student. Older databases may hold duplicates for a day
+    # (e.g. a live mark plus a manual correction); the newest row wins.
+    def _migration_004_attendance_unique_day(self, cursor):
+        # Seeks idx_attendance_student_date per row instead of grouping the whole table
+        cursor.execute(
+            """
+            DELETE FROM attendance WHERE EXISTS (
+                SELECT 1 FROM attendance newer
+                WHERE newer.student_id = attendance.student_id
+                AND newer.att_date = attendance.att_date
+                AND newer.group_id = attendance.group_id
+                AND newer.id > attendance.id
+            )
+        """
+        )
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_unique_day ON attendance(student_id, group_id, att_date)"
+        )
 
     # --- Authentication ---
     # Hash a password before storing it.
@@ -117,7 +287,7 @@ class DatabaseManager:
         return hashlib.sha256(password.encode()).hexdigest()
 
     def register_user(self, username, password, full_name):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute(
@@ -137,7 +307,7 @@ class DatabaseManager:
     # 3) If correct, return a small dict containing the user id/username and is_admin flag.
     # 4) If incorrect, return None so the UI can show a clear error message.
     def login_user(self, username, password):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT id, username, full_name, is_admin FROM users WHERE username=? AND password_hash=?",
@@ -156,7 +326,7 @@ class DatabaseManager:
 
     # --- GROUP MANAGEMENT ---
     def add_group(self, name):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute("INSERT INTO student_groups (name) VALUES (?)", (name,))
@@ -168,7 +338,7 @@ class DatabaseManager:
             conn.close()
 
     def get_all_groups(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute("SELECT id, name FROM student_groups ORDER BY name")
         rows = cursor.fetchall()
@@ -176,7 +346,7 @@ class DatabaseManager:
         return [Group(id=r[0], name=r[1]) for r in rows]
 
     def delete_group(self, group_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -202,7 +372,7 @@ class DatabaseManager:
 
     # --- STUDENT MANAGEMENT ---
     def generate_next_roll_number(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT MAX(CAST(roll_number AS INTEGER)) FROM students")
@@ -215,7 +385,7 @@ class DatabaseManager:
             conn.close()
 
     def add_student(self, name, roll, group_id, path=None):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute(
@@ -229,8 +399,47 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    # Register many students at once (bulk enrollment).
+    # rows: [(name, roll_number, group_id, encoding_path), ...]
+    # Everything runs in one transaction, so either all rows land or none do.
+    # A roll number that already exists keeps its row (name and group) and only gets the
+    # new encoding path; moving students between groups stays an explicit edit
+    # (move_student_to_group), which tells a running app. No change events are emitted:
+    # the caller writes the gallery itself and reloads once.
+    # Returns {roll_number: student_id}, or None if the transaction failed.
+    def add_students_bulk(self, rows):
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(
+                """
+                INSERT INTO students (name, roll_number, group_id, encoding_file_path) VALUES (?, ?, ?, ?)
+                ON CONFLICT(roll_number) DO UPDATE SET
+                    encoding_file_path=excluded.encoding_file_path
+            """,
+                rows,
+            )
+            cursor.execute("SELECT roll_number, id FROM students")
+            ids = {str(r[0]): r[1] for r in cursor.fetchall()}
+            conn.commit()
+            return {str(r[1]): ids[str(r[1])] for r in rows}
+        except sqlite3.Error as e:
+            conn.rollback()
+            print(f"Bulk enrollment failed, nothing was saved: {e}")
+            return None
+        finally:
+            conn.close()
+
+    def get_group_by_name(self, name):
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, name FROM student_groups WHERE name=?", (name,))
+        r = cursor.fetchone()
+        conn.close()
+        return Group(id=r[0], name=r[1]) if r else None
+
     def get_all_students(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -254,25 +463,29 @@ class DatabaseManager:
         ]
 
     def delete_student(self, student_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM students WHERE id=?", (student_id,))
         cursor.execute("DELETE FROM attendance WHERE student_id=?", (student_id,))
         conn.commit()
         conn.close()
+        self._emit("student_deleted", student_id=int(student_id))
 
     def update_student_face(self, student_id, path):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE students SET encoding_file_path=? WHERE id=?", (path, student_id)
         )
         conn.commit()
         conn.close()
+        student = self.get_student(student_id)
+        if student:
+            self._emit("face_updated", student=student)
 
     # --- ACADEMIC MANAGEMENT (Groups & Timetable) ---
     def get_all_teachers(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute("SELECT id, username, full_name FROM users WHERE is_admin=0")
         return [
@@ -285,11 +498,11 @@ class DatabaseManager:
             WHERE group_id = ? 
             ORDER BY day_of_week, start_time
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = (
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.row_factory = (
             sqlite3.Row
         )  # This ensures we can access columns by name later
-        cursor = conn.cursor()
         try:
             cursor.execute(query, (group_id,))
             rows = cursor.fetchall()
@@ -302,7 +515,7 @@ class DatabaseManager:
             conn.close()
 
     def add_timetable_slot_direct(self, teacher_id, group_id, day, start, end):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute(
@@ -322,7 +535,7 @@ class DatabaseManager:
 
     # --- TIMETABLE (UPDATED) ---
     def add_timetable_slot(self, group_id, day, start, end):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO timetable (group_id, day_of_week, start_time, end_time) VALUES (?, ?, ?, ?)",
@@ -332,7 +545,7 @@ class DatabaseManager:
         conn.close()
 
     def delete_timetable_slot(self, slot_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM timetable WHERE id=?", (slot_id,))
         conn.commit()
@@ -359,9 +572,9 @@ class DatabaseManager:
             AND t.day_of_week = ? 
             AND ? BETWEEN t.start_time AND t.end_time
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute(query, (teacher_id, day, current_time))
         row = cursor.fetchone()
@@ -375,7 +588,7 @@ class DatabaseManager:
         return None
 
     def get_students_by_group(self, group_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT id, name, roll_number, encoding_file_path FROM students WHERE group_id=?",
@@ -398,61 +611,77 @@ class DatabaseManager:
     # Uses a UNIQUE constraint to prevent duplicate inserts while the camera runs for many frames.
     # If the row already exists, the insert fails safely and the method returns False (no duplicate log created).
     def mark_attendance(self, student_id, group_id):
-        conn = sqlite3.connect(self.db_path)
+        return bool(self.mark_attendance_many([(student_id, group_id)]))
+
+    # Mark a batch of sightings [(student_id, group_id), ...] in ONE transaction
+    # (used by AttendanceWriter, so a slow disk pays one commit per batch).
+    # Same rule as a single mark: only students without a row today get one.
+    # Returns the student ids that were inserted; raises on database errors
+    # (nothing from the batch is kept) so the caller can retry.
+    def mark_attendance_many(self, events):
+        conn = self._connect()
         cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT id FROM attendance 
-            WHERE student_id=? AND date(timestamp)=date('now')
-        """,
-            (student_id,)
-        )
-
-        if not cursor.fetchone():
-            cursor.execute(
-                """
-                INSERT INTO attendance (student_id, group_id, timestamp, status) 
-                VALUES (?, ?, datetime('now','localtime'), 'PRESENT')
-            """,
-                (student_id, group_id),
-            )
+        today = datetime.now().strftime("%Y-%m-%d")
+        inserted = []
+        try:
+            for student_id, group_id in events:
+                cursor.execute(
+                    """
+                    SELECT id FROM attendance 
+                    WHERE student_id=? AND att_date=?
+                """,
+                    (student_id, today)
+                )
+                if not cursor.fetchone():
+                    # DO NOTHING: a live-view toggle on another thread may have just added the row
+                    cursor.execute(
+                        """
+                        INSERT INTO attendance (student_id, group_id, timestamp, att_date, status) 
+                        VALUES (?, ?, datetime('now','localtime'), ?, 'PRESENT')
+                        ON CONFLICT(student_id, group_id, att_date) DO NOTHING
+                    """,
+                        (student_id, group_id, today),
+                    )
+                    if cursor.rowcount == 1:
+                        inserted.append(student_id)
             conn.commit()
+            return inserted
+        finally:
             conn.close()
-            return True
-        conn.close()
-        return False
 
     def get_todays_attendance(self, group_id):
         print("Fetching today's attendance for group:", group_id)
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
+        today = datetime.now().strftime("%Y-%m-%d")
         cursor.execute(
             """
             SELECT student_id, status FROM attendance 
-            WHERE group_id=? AND date(timestamp)=date('now')
+            WHERE group_id=? AND att_date=?
         """,
-            (group_id,),
+            (group_id, today),
         )
         return {r[0]: r[1] for r in cursor.fetchall()}
 
     def move_student_to_group(self, student_id, new_group_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute(
                 "UPDATE students SET group_id=? WHERE id=?", (new_group_id, student_id)
             )
             conn.commit()
-            return True
         except:
             return False
         finally:
             conn.close()
+        self._emit("student_moved", student_id=int(student_id), group_id=int(new_group_id))
+        return True
 
     def copy_student_to_group(self, student_id, new_group_id):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
 
         try:
             cursor.execute("SELECT * FROM students WHERE id=?", (student_id,))
@@ -473,30 +702,33 @@ class DatabaseManager:
 
             cursor.execute(sql, list(data.values()))
             conn.commit()
-            return True
-
+            new_id = cursor.lastrowid
         except Exception as e:
             print(f"Copy Error: {e}")
             return False
         finally:
             conn.close()
 
+        student = self.get_student(new_id)
+        if student:
+            self._emit("student_added", student=student)
+        return True
+
     def get_session_attendance(self, group_id, date_str):
         """
         Fetch attendance for a specific group on a specific date.
         Returns: { student_id: {'status': 'PRESENT', 'time': 'HH:MM:SS'} }
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
 
         query = """
             SELECT student_id, status, timestamp 
             FROM attendance 
-            WHERE group_id=? AND timestamp LIKE ?
+            WHERE group_id=? AND att_date=?
         """
         
-        search_pattern = f"{date_str}%"
-        cursor.execute(query, (group_id, search_pattern))
+        cursor.execute(query, (group_id, date_str))
         rows = cursor.fetchall()
         conn.close()
 
@@ -522,44 +754,29 @@ class DatabaseManager:
         Saves attendance manually.
         att_map format: { student_id: {'status': 'PRESENT', 'time': 'HH:MM:SS'} }
         """
-        conn = sqlite3.connect(self.db_path)
+        rows = []
+        for student_id, data in att_map.items():
+            # Keep the recorded time; absent/manual-only rows get the start of day
+            time_val = data['time']
+            full_timestamp = f"{date_str} {time_val}" if time_val else f"{date_str} 00:00:00"
+            rows.append((student_id, group_id, full_timestamp, date_str, data['status']))
+
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
-            for student_id, data in att_map.items():
-                status = data['status']
-                time_val = data['time']
-
-                # Construct the full timestamp
-                if time_val:
-                    # If we have a specific time, combine it with the date
-                    full_timestamp = f"{date_str} {time_val}"
-                else:
-                    # If no time (e.g. absent/manual), just use mid-day or start of day
-                    # formatting it allows the 'LIKE' query to still find it later
-                    full_timestamp = f"{date_str} 00:00:00"
-
-                # UPSERT: Insert or Replace if exists
-                # We assume (student_id, group_id, date(timestamp)) logic is handled 
-                # OR we just check if a record exists for this day and update it.
-                
-                # 1. Delete existing record for this student on this day to avoid duplicates
-                # (Simple way to handle updates without complex SQL logic)
-                delete_query = """
-                    DELETE FROM attendance 
-                    WHERE student_id = ? 
-                    AND group_id = ? 
-                    AND timestamp LIKE ?
-                """
-                cursor.execute(delete_query, (student_id, group_id, f"{date_str}%"))
-
-                # 2. Insert new record
-                insert_query = """
-                    INSERT INTO attendance (student_id, group_id, timestamp, status)
-                    VALUES (?, ?, ?, ?)
+            # UPSERT the whole list in one statement: each row is one seek on the
+            # UNIQUE(student_id, group_id, att_date) index, updated in place if it exists
+            cursor.executemany(
                 """
-                cursor.execute(insert_query, (student_id, group_id, full_timestamp, status))
-
+                INSERT INTO attendance (student_id, group_id, timestamp, att_date, status)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(student_id, group_id, att_date) DO UPDATE SET
+                    timestamp = excluded.timestamp,
+                    status = excluded.status
+            """,
+                rows,
+            )
             conn.commit()
             return True
         except Exception as e:
@@ -573,7 +790,7 @@ class DatabaseManager:
         Toggles status between PRESENT and ABSENT for TODAY.
         Used for the Live View manual override.
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         today = datetime.now().strftime("%Y-%m-%d")
 
@@ -581,7 +798,7 @@ class DatabaseManager:
         cursor.execute(
             """
             SELECT id, status FROM attendance 
-            WHERE student_id=? AND group_id=? AND date(timestamp)=?
+            WHERE student_id=? AND group_id=? AND att_date=?
         """,
             (student_id, group_id, today),
         )
@@ -598,13 +815,15 @@ class DatabaseManager:
             )
         else:
             # If no record exists yet, we create one as ABSENT (unusual, but safe) or PRESENT
-            # Usually this method is called on a row that appears in the UI
+            # Usually this method is called on a row that appears in the UI.
+            # DO UPDATE: the AttendanceWriter thread may have inserted today's row since the SELECT
             cursor.execute(
                 """
-                INSERT INTO attendance (student_id, group_id, timestamp, status)
-                VALUES (?, ?, datetime('now','localtime'), 'PRESENT')
+                INSERT INTO attendance (student_id, group_id, timestamp, att_date, status)
+                VALUES (?, ?, datetime('now','localtime'), ?, 'PRESENT')
+                ON CONFLICT(student_id, group_id, att_date) DO UPDATE SET status='PRESENT'
             """,
-                (student_id, group_id),
+                (student_id, group_id, today),
             )
             new_status = "PRESENT"
 
@@ -615,22 +834,8 @@ class DatabaseManager:
     # ==========================================
     # TEACHER - GROUP ASSIGNMENT (New Feature)
     # ==========================================
-    def init_teacher_group_link(self):
-        """Creates the linking table if it doesn't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS teacher_groups (
-                teacher_id INTEGER,
-                group_id INTEGER,
-                PRIMARY KEY (teacher_id, group_id)
-            )
-        """)
-        conn.commit()
-        conn.close()
-
     def assign_teacher_to_group(self, teacher_id, group_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         try:
             cursor.execute("INSERT OR IGNORE INTO teacher_groups (teacher_id, group_id) VALUES (?, ?)", 
@@ -644,7 +849,7 @@ class DatabaseManager:
             conn.close()
 
     def remove_teacher_from_group(self, teacher_id, group_id):
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM teacher_groups WHERE teacher_id=? AND group_id=?", 
                        (teacher_id, group_id))
@@ -653,9 +858,9 @@ class DatabaseManager:
 
     def get_groups_for_teacher(self, teacher_id):
         """Returns only the groups assigned to this teacher."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         query = """
             SELECT g.id, g.name 
             FROM student_groups g
@@ -0,0 +1,103 @@
+import time
+
+
+class AdaptiveScheduler:
+    """
+    Chooses how often to run heavy recognition and at what detection scale,
+    from what the current PC and scene actually cost instead of fixed knobs.
+
+    Inputs:
+    - per heavy cycle: detect ms, encode ms, number of faces
+    - per frame: motion score (mean absolute frame difference, 0..255)
+
+    Decisions:
+    - interval: minimum seconds between heavy cycles. Never below
+      cycle_cost / max_duty, so recognition leaves the CPU free for the UI
+      frame budget; shorter when the scene moves, longer when it is static.
+    - scale_factor: lowered when a cycle overruns target_cycle_ms, raised
+      again (for small, distant faces) when there is headroom.
+    """
+
+    def __init__(self, frame_budget_ms=33.0, max_duty=0.35, target_cycle_ms=80.0,
+                 min_interval=0.05, max_interval=1.0, min_scale=0.15, max_scale=0.35,
+                 scale=0.20, motion_low=1.0, motion_high=8.0):
+        self.frame_budget_ms = frame_budget_ms  # UI frame time we protect (~30 FPS)
+        self.max_duty = max_duty                # max fraction of wall time spent recognising
+        self.target_cycle_ms = target_cycle_ms  # heavy cycle cost we aim for
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.motion_low = motion_low            # below: static scene
+        self.motion_high = motion_high          # above: lots of movement
+
+        # Smoothed measurements
+        self.cycle_ms = 0.0
+        self.detect_ms = 0.0
+        self.encode_ms = 0.0
+        self.faces = 0
+        self.motion = 0.0
+
+        # Current decisions
+        self.scale_factor = scale
+        self.interval = min_interval
+        self._last_run = 0.0
+
+    @staticmethod
+    def _ema(old, new, alpha=0.2):
+        return new if old == 0 else (1 - alpha) * old + alpha * new
+
+    def record_motion(self, score):
+        self.motion = self._ema(self.motion, float(score), 0.3)
+        # Per frame, so a burst of movement shortens the current wait straight away
+        self._update_interval()
+
+    def record_cycle(self, detect_ms, encode_ms, faces):
+        self.detect_ms = self._ema(self.detect_ms, detect_ms)
+        self.encode_ms = self._ema(self.encode_ms, encode_ms)
+        self.cycle_ms = self._ema(self.cycle_ms, detect_ms + encode_ms)
+        self.faces = faces
+        self._adapt_scale()
+        self._update_interval()
+
+    def should_run(self, now=None):
+        now = time.time() if now is None else now
+        if now - self._last_run < self.interval:
+            return False
+        self._last_run = now
+        return True
+
+    def _adapt_scale(self):
+        # Detection cost grows ~ with scale^2; step gently to avoid oscillating
+        if self.detect_ms > self.target_cycle_ms and self.scale_factor > self.min_scale:
+            self.scale_factor = max(self.min_scale, round(self.scale_factor - 0.025, 3))
+        elif self.cycle_ms < 0.5 * self.target_cycle_ms and self.scale_factor < self.max_scale:
+            self.scale_factor = min(self.max_scale, round(self.scale_factor + 0.025, 3))
+
+    def _update_interval(self):
+        # Motion 0..1: static classroom -> slow rate, people moving -> fast rate
+        span = max(1e-6, self.motion_high - self.motion_low)
+        activity = min(1.0, max(0.0, (self.motion - self.motion_low) / span))
+        if self.faces == 0:
+            activity = max(activity, 0.25)  # keep looking for people walking in
+        wanted = self.max_interval - activity * (self.max_interval - self.min_interval)
+
+        # CPU guard: a cycle that costs more than the UI frame budget needs a
+        # proportionally longer gap so the display loop keeps its share
+        cpu_floor = (self.cycle_ms / 1000.0) / self.max_duty
+        if self.cycle_ms > self.frame_budget_ms:
+            cpu_floor *= self.cycle_ms / self.frame_budget_ms
+        self.interval = min(self.max_interval, max(self.min_interval, wanted, cpu_floor))
+
+    def telemetry(self):
+        """Current measurements and decisions, for the overlay / logs."""
+        return {
+            "cycle_ms": round(self.cycle_ms, 1),
+            "detect_ms": round(self.detect_ms, 1),
+            "encode_ms": round(self.encode_ms, 1),
+            "faces": self.faces,
+            "motion": round(self.motion, 2),
+            "interval_ms": round(self.interval * 1000.0, 1),
+            "target_rec_fps": round(1.0 / self.interval, 1) if self.interval > 0 else 0.0,
+            "scale_factor": self.scale_factor,
+        }
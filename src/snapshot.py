@@ -0,0 +1,106 @@
+import json
+import math
+import os
+import struct
+import time
+
+
+class SessionSnapshot:
+    """
+    Small binary file describing the live session, so a restarted app resumes in place.
+
+    Layout (little-endian):
+        header (40 bytes): magic, format version, saved_at, gallery generation,
+                           meta length, present count, track count
+        meta:              UTF-8 JSON (day, teacher id, timetable slot, camera state, track names)
+        present:           count x int64 student ids marked for the session
+        tracks:            count x (int64 student_id, float32[4] box, int32 votes, float32 distance)
+
+    save() writes a temporary file and os.replace()s it over the previous one, so
+    a crash mid-write (or a reader racing the writer) only ever sees a complete
+    snapshot. A typical class fits in well under a kilobyte. Standard library
+    only, so the app can read it without importing NumPy at startup.
+    """
+
+    MAGIC = b"AASNAPSH"
+    VERSION = 1
+    HEADER = struct.Struct("<8sIdQIII")  # magic, version, saved_at, generation, meta_len, n_present, n_tracks
+    TRACK = struct.Struct("<q4fif")  # student_id, box (top, right, bottom, left), votes, distance
+
+    def __init__(self, path="data/session.snap"):
+        self.path = path
+
+    def save(self, teacher_id, session, present, tracks=(), gallery_generation=0, camera_running=False):
+        """
+        session: the timetable row from get_active_session_info.
+        tracks: [(student_id, name, box, votes, distance)] as from FaceRecognizer.export_tracks.
+        """
+        tracks = list(tracks)
+        meta = json.dumps({
+            "day": time.strftime("%Y-%m-%d"),
+            "teacher_id": teacher_id,
+            "session": session,
+            "camera_running": bool(camera_running),
+            "track_names": [name for _, name, _, _, _ in tracks],
+        }).encode("utf-8")
+        ids = [int(sid) for sid in present]
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, time.time(), gallery_generation,
+                                     len(meta), len(ids), len(tracks)))
+            f.write(meta)
+            f.write(struct.pack(f"<{len(ids)}q", *ids))
+            for sid, _, box, votes, distance in tracks:
+                f.write(self.TRACK.pack(sid, *box, votes, math.nan if distance is None else distance))
+        os.replace(tmp, self.path)
+
+    def load(self):
+        """The last snapshot as a dict, or None if there is none (or it is unreadable)."""
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Session snapshot unreadable: {e}")
+            return None
+
+        try:
+            magic, version, saved_at, generation, meta_len, n_present, n_tracks = self.HEADER.unpack_from(raw)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError(f"unsupported snapshot file (version {version})")
+            off = self.HEADER.size
+            meta = json.loads(raw[off:off + meta_len].decode("utf-8"))
+            off += meta_len
+            present = struct.unpack_from(f"<{n_present}q", raw, off)
+            off += 8 * n_present
+            rows = [self.TRACK.unpack_from(raw, off + i * self.TRACK.size) for i in range(n_tracks)]
+            names = meta.get("track_names", [])
+            if len(names) != n_tracks:
+                raise ValueError("track names do not match track records")
+        except (struct.error, ValueError) as e:
+            print(f"Session snapshot ignored: {e}")
+            return None
+
+        tracks = [
+            (sid, name, (top, right, bottom, left), votes, None if math.isnan(distance) else distance)
+            for (sid, top, right, bottom, left, votes, distance), name in zip(rows, names)
+        ]
+        return {
+            "saved_at": saved_at,
+            "gallery_generation": generation,
+            "day": meta.get("day"),
+            "teacher_id": meta.get("teacher_id"),
+            "session": meta.get("session") or {},
+            "camera_running": meta.get("camera_running", False),
+            "present": set(present),
+            "tracks": tracks,
+        }
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,227 @@
+import itertools
+from collections import Counter, deque
+
+import cv2
+import numpy as np
+
+
+def iou(a, b):
+    """Intersection-over-union of two (top, right, bottom, left) boxes."""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    inter = max(0.0, bottom - top) * max(0.0, right - left)
+    if inter <= 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return inter / float(area_a + area_b - inter)
+
+
+class Track:
+    """One face followed across frames. Boxes are full-frame (top, right, bottom, left) floats."""
+
+    def __init__(self, track_id, box, vote_window=7):
+        self.id = track_id
+        self.box = box
+        self.student_id = None
+        self.name = "Unknown"
+        self.distance = None      # mean match distance of the winning votes
+        self.identified_at = 0.0  # when this track was last encoded (0 = never)
+        self.misses = 0           # consecutive detection cycles without a matching detection
+        self.points = None        # optical-flow feature points, tracker-scale coords (K,1,2)
+
+        # Rolling identity vote over the last K encodings: (student_id, distance)
+        self.votes = deque(maxlen=vote_window)
+        self.consistent_votes = 0  # how many of those votes agree with the current identity
+        self._names = {}
+
+    def vote(self, student_id, name, distance, now):
+        """Add one identification result; the identity is the majority of the window."""
+        self.votes.append((student_id, distance))
+        if student_id is not None:
+            self._names[student_id] = name
+        self.identified_at = now
+
+        winner, count = Counter(sid for sid, _ in self.votes).most_common(1)[0]
+        dists = [d for sid, d in self.votes if sid == winner and d is not None]
+
+        self.student_id = winner
+        self.name = self._names.get(winner, "Unknown") if winner is not None else "Unknown"
+        self.distance = sum(dists) / len(dists) if dists else None
+        self.consistent_votes = count if winner is not None else 0
+
+    def is_locked(self, lock_votes):
+        return self.student_id is not None and self.consistent_votes >= lock_votes
+
+    def result(self):
+        top, right, bottom, left = (int(round(v)) for v in self.box)
+        return (self.student_id, self.name, (top, right, bottom, left))
+
+
+class FaceTracker:
+    """
+    Keeps face boxes moving between detections so they don't freeze and jump.
+
+    - Every frame: pyramidal Lucas-Kanade optical flow on a downscaled grey frame
+      shifts (and slightly rescales) each track's box. Costs ~1 ms.
+    - Every detection cycle: detections are associated to tracks by IoU. Tracks vote
+      on their identity each time they are encoded; once a track is locked (enough
+      agreeing votes) it is only re-sampled every locked_recheck seconds.
+    """
+
+    def __init__(self, scale=0.5, iou_threshold=0.3, max_misses=2,
+                 vote_window=7, lock_votes=4, locked_recheck=10.0, unknown_retry=0.5):
+        self.scale = scale                      # flow runs at this fraction of full resolution
+        self.iou_threshold = iou_threshold      # min IoU to treat a detection as the same face
+        self.max_misses = max_misses            # detection cycles a track may go unseen
+        self.vote_window = vote_window          # identity votes remembered per track
+        self.lock_votes = lock_votes            # agreeing votes needed to lock a track
+        self.locked_recheck = locked_recheck    # seconds between encodings of a locked track
+        self.unknown_retry = unknown_retry      # seconds between re-tries for unknown faces
+
+        self.tracks = []
+        self._ids = itertools.count(1)
+        self._prev_gray = None
+
+    def reset(self):
+        self.tracks = []
+        self._prev_gray = None
+
+    def invalidate_identities(self):
+        """Force every track to be re-voted from scratch on the next detection cycle (gallery changed)."""
+        for t in self.tracks:
+            t.identified_at = 0.0
+            t.votes.clear()
+            t.consistent_votes = 0
+
+    def results(self):
+        return [t.result() for t in self.tracks]
+
+    def export_identities(self):
+        """(student_id, name, box, consistent_votes, distance) of every identified track (session snapshot)."""
+        return [(t.student_id, t.name, t.box, t.consistent_votes, t.distance)
+                for t in list(self.tracks) if t.student_id is not None]
+
+    def restore_identities(self, rows):
+        """
+        Recreate tracks from export_identities(). They keep their votes, so labels
+        and confirmations are back immediately, but are re-encoded on the next
+        detection cycle in case someone else now sits in that box.
+        """
+        for sid, name, box, votes, distance in rows:
+            t = Track(next(self._ids), tuple(float(v) for v in box), self.vote_window)
+            for _ in range(max(1, min(int(votes), self.vote_window))):
+                t.vote(sid, name, distance, 0.0)  # identified_at = 0 -> due for encoding
+            self.tracks.append(t)
+
+    # --- Per-frame optical flow ---
+    def step(self, frame_rgb):
+        """Move every track with sparse optical flow from the previous frame."""
+        small = cv2.resize(frame_rgb, (0, 0), fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        prev, self._prev_gray = self._prev_gray, gray
+
+        if prev is None or prev.shape != gray.shape:
+            return
+
+        for t in self.tracks:
+            if t.points is None or len(t.points) < 3:
+                t.points = self._features(prev, t.box)
+                if t.points is None:
+                    continue
+
+            nxt, status, _ = cv2.calcOpticalFlowPyrLK(prev, gray, t.points, None, winSize=(15, 15), maxLevel=2)
+            ok = status.reshape(-1) == 1
+            if ok.sum() < 3:
+                t.points = None
+                continue
+
+            old = t.points[ok].reshape(-1, 2)
+            new = nxt[ok].reshape(-1, 2)
+            dx, dy = np.median(new - old, axis=0) / self.scale
+
+            # Scale change from how the point cloud spreads around its centre
+            zoom = 1.0
+            if len(old) >= 4:
+                d_old = np.linalg.norm(old - old.mean(axis=0), axis=1)
+                d_new = np.linalg.norm(new - new.mean(axis=0), axis=1)
+                zoom = float(np.clip(np.median(d_new / np.maximum(d_old, 1e-3)), 0.8, 1.25))
+
+            t.box = self._move(t.box, float(dx), float(dy), zoom)
+            t.points = new.reshape(-1, 1, 2)
+
+    def _features(self, gray, box, max_points=20):
+        h, w = gray.shape
+        top, right, bottom, left = (v * self.scale for v in box)
+        top, bottom = int(max(0, top)), int(min(h, bottom))
+        left, right = int(max(0, left)), int(min(w, right))
+        if bottom - top < 4 or right - left < 4:
+            return None
+
+        mask = np.zeros_like(gray)
+        mask[top:bottom, left:right] = 255
+        pts = cv2.goodFeaturesToTrack(gray, maxCorners=max_points, qualityLevel=0.01, minDistance=3, mask=mask)
+        if pts is None or len(pts) < 3:
+            return None
+        return pts.astype(np.float32)
+
+    @staticmethod
+    def _move(box, dx, dy, zoom):
+        top, right, bottom, left = box
+        cy, cx = (top + bottom) / 2.0 + dy, (left + right) / 2.0 + dx
+        hh, hw = (bottom - top) * zoom / 2.0, (right - left) * zoom / 2.0
+        return (cy - hh, cx + hw, cy + hh, cx - hw)
+
+    # --- Detection-cycle association ---
+    def associate(self, boxes, now):
+        """
+        Greedy highest-IoU matching of detected boxes to existing tracks.
+        Unmatched detections start new tracks; tracks unseen for more than
+        max_misses cycles are dropped.
+
+        Returns [(track, box_index), ...] for tracks that need an identity encoding.
+        """
+        pairs = sorted(
+            ((iou(t.box, b), ti, bi) for ti, t in enumerate(self.tracks) for bi, b in enumerate(boxes)),
+            reverse=True,
+        )
+
+        matched_tracks, box_track = set(), {}
+        for score, ti, bi in pairs:
+            if score < self.iou_threshold:
+                break
+            if ti in matched_tracks or bi in box_track:
+                continue
+            t = self.tracks[ti]
+            t.box = boxes[bi]
+            t.misses = 0
+            t.points = None  # re-seed flow points on the fresh box
+            matched_tracks.add(ti)
+            box_track[bi] = t
+
+        for ti, t in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                t.misses += 1
+        self.tracks = [t for t in self.tracks if t.misses <= self.max_misses]
+
+        for bi, b in enumerate(boxes):
+            if bi not in box_track:
+                t = Track(next(self._ids), b, self.vote_window)
+                self.tracks.append(t)
+                box_track[bi] = t
+
+        return [(t, bi) for bi, t in sorted(box_track.items()) if self._needs_identity(t, now)]
+
+    def _needs_identity(self, track, now):
+        if track.identified_at <= 0:
+            return True
+        age = now - track.identified_at
+        if track.is_locked(self.lock_votes):
+            return age >= self.locked_recheck
+        if track.student_id is None:
+            return age >= self.unknown_retry
+        return True  # known but not locked yet: keep collecting votes
+
+    def confirmed_ids(self, min_votes):
+        """Student ids whose track has at least min_votes agreeing identifications."""
+        return {t.student_id for t in self.tracks if t.student_id is not None and t.consistent_votes >= min_votes}
@@ -24,10 +24,10 @@ class ReportGenerator:
             SELECT s.roll_number, s.name, a.timestamp, a.status
             FROM attendance a
             JOIN students s ON a.student_id = s.id
-            WHERE date(a.timestamp) = date('now')
+            WHERE a.att_date = ?
         """
 
-        cursor.execute(query)
+        cursor.execute(query, (today,))
         rows = cursor.fetchall()
         conn.close()
 
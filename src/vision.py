@@ -2,7 +2,37 @@ import face_recognition
 import numpy as np
 import os
 import cv2
+import threading
 import time
+from src.encoding_cache import EncodingCache, file_sha1
+from src.gallery import GalleryStore
+from src.index import build_index, select_templates
+from src.motion import MotionRegions
+from src.scheduler import AdaptiveScheduler
+from src.tracking import FaceTracker
+
+
+def encode_image_file(path):
+    """
+    Decode one image file and encode its first face.
+    Returns (encoding, None) or (None, reason). Module level so process pools can use it.
+    """
+    try:
+        # Robust Windows decode (handles Unicode paths + odd JPEG variants)
+        data = np.fromfile(path, dtype=np.uint8)
+        bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if bgr is None:
+            return None, "OpenCV could not decode image"
+
+        rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+
+        encs = face_recognition.face_encodings(rgb)
+        if not encs:
+            return None, "No face found"
+        return encs[0], None
+    except Exception as e:
+        return None, str(e)
 
 
 class FaceRecognizer:
@@ -15,87 +45,342 @@ class FaceRecognizer:
         self.encoding_dir = encoding_dir
         os.makedirs(self.encoding_dir, exist_ok=True)
 
+        # All encodings in one memory-mapped file; per-student .npy files remain the migration source
+        self.gallery = GalleryStore(os.path.join(self.encoding_dir, "gallery.bin"))
+        # Re-uploaded photos (same bytes) skip decoding + dlib
+        self.encoding_cache = EncodingCache(os.path.join(self.encoding_dir, "encoding_cache.db"))
+
         self.known_encodings = []
         self.known_ids = []
+        self.known_group_ids = []  # group_id per gallery row (parallel to known_ids)
         self.student_names = {}  # Map ID to Name for UI labels
+        self.active_group_id = None  # None = match against the whole school
 
         # --- Performance knobs (safe defaults) ---
         self.scale_factor = 0.20          # smaller = faster (0.20–0.25 recommended)
         self.threshold = 0.50             # same as your current threshold
         self.detect_model = "hog"         # fastest on CPU; do not use "cnn" on Windows CPU
-        self.process_every_n_frames = 3   # run heavy recognition every N frames
+        self.adaptive = True              # AdaptiveScheduler picks rate + scale; the two knobs below apply when False
+        self.process_every_n_frames = 6   # run heavy recognition every N frames (tracker fills the gaps)
         self.max_fps_for_recognition = 12 # cap heavy recognition calls per second
+        self.encoder_workers = 0          # >1 shards face encoding across a process pool
+        self.min_faces_for_pool = 2       # below this, encoding in-process is cheaper than IPC
+        self.index_kind = "auto"          # "flat" (exact) | "ivf" (approximate) | "auto" by gallery size
+        self.ivf_min_gallery = 20000      # "auto" switches to IVF at this many students
+        self.ivf_n_probe = 8              # IVF cells scanned per query (higher = better recall)
+        self.use_tracking = True          # move boxes with optical flow between heavy cycles
+        self.use_motion_roi = True        # run HOG only where the scene changed / around tracks
+        self.encode_full_res = True       # detect on the small frame, encode from the full-resolution frame
+        self.min_votes_for_attendance = 3 # agreeing track votes before a student counts as present
+        self.max_templates = 5            # encodings kept per student (k-medoids of the uploaded photos)
 
         # --- Cache state ---
         self._frame_count = 0
         self._last_results = []
         self._last_run_time = 0.0
+
+        # --- Telemetry ---
+        self.heavy_cycles = 0             # number of detect+encode passes actually run
+        self.last_cycle_ms = 0.0          # duration of the most recent heavy pass
+        self.encodings_run = 0            # faces actually sent through dlib encoding
+        self.encodings_saved = 0          # detected faces skipped because their track is settled
+        self._confirmed_ids = frozenset() # published for the UI thread (see confirmed_ids)
+        self._cycle_encode_ms = 0.0
+        self._motion_prev = None
+
+        # Measures cycle cost + scene motion and decides recognition rate / scale
+        self.scheduler = AdaptiveScheduler(scale=self.scale_factor)
         
         # Precomputed matrix for fast distance calculation
         self._enc_matrix = None  # shape: (N, 128)
+        self._index = None  # FlatIndex / IVFIndex over _enc_matrix (see src/index.py)
+        self._group_views = {}  # group_id -> (index, row ids), built on first use
+        self._search = (None, [])  # (index, row->student_id) used by match_encodings
+        self._enc_buffer = None  # owned (capacity, 128) buffer once the gallery is patched in place
+        self._gallery_lock = threading.Lock()  # guards gallery swaps/patches vs. matching
+
+        # Motion-mask pre-stage for detection (see src/motion.py)
+        self._motion = MotionRegions()
+        self.roi_scans = 0                # heavy cycles that scanned only regions of interest
+        self.full_scans = 0               # heavy cycles that scanned the whole frame
+
+        # Tracks carry boxes + identities between heavy cycles (see src/tracking.py)
+        self._tracker = FaceTracker()
+
+        # Optional multi-process encoder (created lazily, see _encode)
+        self._pool = None
 
     def load_encodings(self, students):
-        """Loads encodings from disk into memory."""
-        self.known_encodings = []
-        self.known_ids = []
-        self.student_names = {}
+        """
+        Loads encodings into memory.
+        The consolidated gallery file is memory-mapped (float32, zero-copy); students
+        that only have a legacy per-student .npy file are migrated into it on the way.
+        """
+        # Build into locals and swap at the end: the recognition worker may be
+        # reading the gallery from another thread while this runs.
+        by_id = {s.id: s for s in students}
 
+        # Compaction rewrites the file, which Windows refuses while our previous
+        # load still maps it, so only try it on the first load (app startup).
+        if self._enc_matrix is None:
+            try:
+                self.gallery.compact()  # only rewrites when many records are tombstoned
+            except OSError as e:
+                print(f"Gallery compaction skipped: {e}")
+        ids, encs = self.gallery.load()
+        self._migrate_npy(students, set(ids.tolist()))
+        ids, encs = self.gallery.load()
+
+        mask = np.isin(ids, np.fromiter(by_id, dtype=np.int64, count=len(by_id)))
+        if not mask.any():
+            enc_matrix = None
+        elif mask.all():
+            enc_matrix = encs  # the mapped file itself, no copy
+        else:
+            enc_matrix = np.ascontiguousarray(encs[mask])  # (N,128) float32
+
+        known_ids = ids[mask].tolist()
+        known_group_ids = [by_id[i].group_id for i in known_ids]
+        student_names = {i: by_id[i].name for i in known_ids}
+
+        # Precompute search index for fast vectorized distance
+        index = self._build_index(enc_matrix, known_ids)
+
+        with self._gallery_lock:
+            self.student_names = student_names
+            self.known_encodings = enc_matrix if enc_matrix is not None else []
+            self.known_ids = known_ids
+            self.known_group_ids = known_group_ids
+            self._enc_matrix = enc_matrix
+            self._enc_buffer = None
+            self._index = index
+
+            # Sub-galleries refer to the old matrix; rebuild the active one lazily
+            self._group_views = {}
+            self._search = self._view_for(self.active_group_id)
+        self._tracker.invalidate_identities()
+
+    def _migrate_npy(self, students, in_gallery):
+        """Append students missing from the gallery file, read from their per-student .npy files."""
+        new_ids, new_encs = [], []
         for student in students:
+            if student.id in in_gallery or not student.encoding_path:
+                continue
             if os.path.exists(student.encoding_path):
                 try:
-                    enc = np.load(student.encoding_path)
-                    # Ensure float64 for stable distance math
-                    enc = np.asarray(enc, dtype=np.float64)
-                    if enc.shape == (128,):
-                        self.known_encodings.append(enc)
-                        self.known_ids.append(student.id)
-                        self.student_names[student.id] = student.name
+                    # (128,) legacy averaged encoding or (K,128) templates
+                    enc = np.asarray(np.load(student.encoding_path), dtype=np.float32)
+                    if enc.ndim in (1, 2) and enc.shape[-1] == 128:
+                        enc = enc.reshape(-1, 128)
+                        new_ids.extend([student.id] * len(enc))
+                        new_encs.append(enc)
                 except Exception as e:
                     print(f"Error loading encoding for {student.name}: {e}")
 
-        # Precompute matrix for fast vectorized distance
-        if self.known_encodings:
-            self._enc_matrix = np.vstack(self.known_encodings)  # (N,128)
+        if new_ids:
+            self.gallery.append(new_ids, np.vstack(new_encs))
+
+    def set_active_group(self, group_id):
+        """
+        Restrict matching to one group's students (None = whole school).
+        Cuts per-face distance work from school size to class size and stops
+        students from other groups being matched in this room.
+        """
+        if group_id == self.active_group_id and self._enc_matrix is not None:
+            return  # same class: keep the tracks (and their votes) we already have
+        with self._gallery_lock:
+            self.active_group_id = group_id
+            self._search = self._view_for(group_id)
+        self._tracker.invalidate_identities()
+
+    def _view_for(self, group_id):
+        """(index, row ids) for a group: a row subset of the global gallery, cached per group."""
+        if group_id is None:
+            return (self._index, self.known_ids)
+
+        view = self._group_views.get(group_id)
+        if view is None:
+            rows = [i for i, g in enumerate(self.known_group_ids) if g == group_id]
+            sub_matrix = self._enc_matrix[rows] if rows else None
+            sub_ids = [self.known_ids[i] for i in rows]
+            view = (self._build_index(sub_matrix, sub_ids), sub_ids)
+            self._group_views[group_id] = view
+        return view
+
+    def _build_index(self, enc_matrix, ids, previous=None):
+        # ids label the rows so students with several templates come back once, at their best template
+        opts = {"n_probe": self.ivf_n_probe} if self.index_kind != "flat" else {}
+        if previous is not None and getattr(previous, "kind", None) == "ivf":
+            opts["centroids"] = previous.centroids  # re-bucket only, skip k-means
+        return build_index(enc_matrix, self.index_kind, self.ivf_min_gallery, labels=ids, **opts)
+
+    # --- Incremental gallery updates (no full reload) ---
+    def add_student(self, student, encodings, persist=True):
+        """Add a student's encoding(s) to the live gallery (and the gallery file)."""
+        encs = np.asarray(encodings, dtype=np.float32).reshape(-1, 128)
+        if persist:
+            self.gallery.append([student.id] * len(encs), encs)
+
+        with self._gallery_lock:
+            n = len(self.known_ids)
+            self._reserve(len(encs))
+            self._enc_buffer[n:n + len(encs)] = encs
+            self.student_names = {**self.student_names, student.id: student.name}
+            self._publish(
+                self.known_ids + [student.id] * len(encs),
+                self.known_group_ids + [student.group_id] * len(encs),
+                {student.group_id},
+            )
+        self._tracker.invalidate_identities()
+
+    def replace_student(self, student, encodings):
+        """Swap a student's encoding(s) after a new face upload."""
+        self.remove_student(student.id)
+        self.add_student(student, encodings)
+
+    def remove_student(self, student_id, persist=True):
+        """Drop every gallery row of a student."""
+        if persist:
+            self.gallery.remove(student_id)
+
+        with self._gallery_lock:
+            rows = [i for i, sid in enumerate(self.known_ids) if sid == student_id]
+            if not rows:
+                return
+            self._reserve(0)
+            known_ids, known_group_ids = list(self.known_ids), list(self.known_group_ids)
+            changed = {known_group_ids[i] for i in rows}
+
+            # Swap-remove: move the tail row into each hole (order doesn't matter for matching)
+            for i in reversed(rows):
+                last = len(known_ids) - 1
+                if i != last:
+                    self._enc_buffer[i] = self._enc_buffer[last]
+                    known_ids[i], known_group_ids[i] = known_ids[last], known_group_ids[last]
+                known_ids.pop()
+                known_group_ids.pop()
+
+            self.student_names = {k: v for k, v in self.student_names.items() if k != student_id}
+            self._publish(known_ids, known_group_ids, changed)
+        self._tracker.invalidate_identities()
+
+    def move_student(self, student_id, new_group_id):
+        """Re-label a student's rows with a new group (no encoding work)."""
+        with self._gallery_lock:
+            known_group_ids = list(self.known_group_ids)
+            changed = {new_group_id}
+            for i, sid in enumerate(self.known_ids):
+                if sid == student_id:
+                    changed.add(known_group_ids[i])
+                    known_group_ids[i] = new_group_id
+            if len(changed) > 1:
+                self._publish(self.known_ids, known_group_ids, changed, reindex=False)
+        if len(changed) > 1:
+            self._tracker.invalidate_identities()  # a track locked to them may no longer be a candidate
+
+    def on_db_change(self, event, **data):
+        """DatabaseManager subscriber: keep the live gallery in step with student edits."""
+        if event == "student_deleted":
+            self.remove_student(data["student_id"])
+        elif event == "student_moved":
+            self.move_student(data["student_id"], data["group_id"])
+        elif event in ("face_updated", "student_added"):
+            student = data["student"]
+            if not student.encoding_path or not os.path.exists(student.encoding_path):
+                return
+            enc = np.load(student.encoding_path)
+            if event == "face_updated":
+                self.replace_student(student, enc)
+            else:
+                self.add_student(student, enc)
+
+    def _reserve(self, extra):
+        """Ensure an owned buffer with room for `extra` more rows (capacity doubles)."""
+        n = len(self.known_ids)
+        if self._enc_buffer is None or n + extra > self._enc_buffer.shape[0]:
+            buf = np.empty((max(64, 2 * (n + extra)), 128), dtype=np.float32)
+            if n:
+                buf[:n] = self._enc_matrix  # first patch copies out of the mapped file
+            self._enc_buffer = buf
+
+    def _publish(self, known_ids, known_group_ids, changed_groups, reindex=True):
+        """Install patched rows/ids (caller holds _gallery_lock)."""
+        n = len(known_ids)
+        if reindex:
+            self._enc_matrix = self._enc_buffer[:n] if n else None
+            self._index = self._build_index(self._enc_matrix, known_ids, previous=self._index)
+            self.known_encodings = self._enc_matrix if n else []
+        self.known_ids = known_ids
+        self.known_group_ids = known_group_ids
+        if reindex:
+            self._group_views = {}  # row positions moved; per-group views are rebuilt on demand
         else:
-            self._enc_matrix = None
+            for g in changed_groups:
+                self._group_views.pop(g, None)
+        self._search = self._view_for(self.active_group_id)
 
     def register_faces(self, image_paths, name, roll_no):
         encodings = []
 
+        for path, (enc, error) in zip(image_paths, self.encode_files(image_paths)):
+            if enc is None:
+                print(f"Skipping file {path}: {error}")
+            else:
+                encodings.append(enc)
+
+        return self.save_student_encoding(encodings, name, roll_no)
+
+    def encode_files(self, image_paths):
+        """(encoding, error) per image path; files whose bytes were seen before come from the cache."""
+        keys, unreadable = [], {}
         for path in image_paths:
             try:
-                # Robust Windows decode (handles Unicode paths + odd JPEG variants)
-                data = np.fromfile(path, dtype=np.uint8)
-                bgr = cv2.imdecode(data, cv2.IMREAD_COLOR)
-                if bgr is None:
-                    print(f"Skipping file {path}: OpenCV could not decode image")
-                    continue
-
-                rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-                rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
-
-                encs = face_recognition.face_encodings(rgb)
-                if encs:
-                    encodings.append(encs[0])
-                else:
-                    print(f"Skipping file {path}: No face found")
-
-            except Exception as e:
-                print(f"Skipping file {path}: {e}")
-
-        if not encodings:
+                keys.append(file_sha1(path))
+            except OSError as e:
+                keys.append(None)
+                unreadable[path] = str(e)
+
+        cached = self.encoding_cache.get_many(k for k in keys if k)
+        results, fresh = [], []
+        for path, key in zip(image_paths, keys):
+            if key is None:
+                results.append((None, unreadable[path]))
+            elif key in cached:
+                results.append(cached[key])
+            else:
+                enc, error = encode_image_file(path)
+                cached[key] = (enc, error)  # duplicates within this upload are encoded once
+                fresh.append((key, enc, error))
+                results.append((enc, error))
+
+        self.encoding_cache.put_many(fresh)
+        return results
+
+    def save_student_encoding(self, encodings, name, roll_no):
+        """
+        Write a student's templates to their .npy file; returns the path (None if empty).
+        Keeps up to max_templates real encodings (k-medoids) instead of one average,
+        so pose/lighting variation survives and the gallery stays bounded per student.
+        """
+        if not len(encodings):
             return None
 
-        avg_encoding = np.mean(encodings, axis=0)
+        templates = select_templates(encodings, max(1, int(self.max_templates)))  # (K,128)
         filename = f"{roll_no}_{name.replace(' ', '_')}.npy"
         save_path = os.path.join(self.encoding_dir, filename)
-        np.save(save_path, avg_encoding)
+        np.save(save_path, templates)
         return save_path
 
     def _should_run_heavy(self):
         """Decide whether to run detection+encoding this call."""
         self._frame_count += 1
 
+        if self.adaptive:
+            if not self.scheduler.should_run():
+                return False
+            self._last_run_time = time.time()
+            return True
+
         # Run only every N frames
         if self.process_every_n_frames > 1 and (self._frame_count % self.process_every_n_frames) != 0:
             return False
@@ -117,50 +402,237 @@ class FaceRecognizer:
         if frame_rgb is None:
             return []
 
+        if self.adaptive:
+            self.scheduler.record_motion(self._motion_score(frame_rgb))
+
+        # Cheap per-frame stage: slide tracked boxes along with the faces
+        if self.use_tracking:
+            self._tracker.step(frame_rgb)
+
         # If we skip heavy compute, reuse last results (smooth UI, higher FPS)
         if not self._should_run_heavy():
+            if self.use_tracking:
+                self._last_results = self._tracker.results()
             return self._last_results
 
-        # 1) Resize for speed
-        sf = float(self.scale_factor)
+        t0 = time.perf_counter()
+        results = self._run_heavy(frame_rgb)
+        self.heavy_cycles += 1
+        self.last_cycle_ms = (time.perf_counter() - t0) * 1000.0
+
+        self._last_results = results
+        self._confirmed_ids = self._compute_confirmed(results)
+        return results
+
+    def _motion_score(self, frame_rgb):
+        """Mean absolute difference between consecutive tiny grey frames (0..255)."""
+        tiny = cv2.resize(frame_rgb, (80, 60), interpolation=cv2.INTER_AREA)
+        tiny = cv2.cvtColor(tiny, cv2.COLOR_RGB2GRAY)
+        prev, self._motion_prev = self._motion_prev, tiny
+        if prev is None:
+            return 0.0
+        return float(cv2.absdiff(tiny, prev).mean())
+
+    def telemetry(self):
+        """Scheduler decisions + recognition counters (see AdaptiveScheduler.telemetry)."""
+        data = self.scheduler.telemetry() if self.adaptive else {"scale_factor": self.scale_factor}
+        data.update({
+            "heavy_cycles": self.heavy_cycles,
+            "last_cycle_ms": round(self.last_cycle_ms, 1),
+            "encodings_run": self.encodings_run,
+            "encodings_saved": self.encodings_saved,
+            "roi_scans": self.roi_scans,
+            "full_scans": self.full_scans,
+            "roi_fraction": round(self._motion.last_fraction, 3),
+        })
+        return data
+
+    def confirmed_ids(self):
+        """
+        Student ids identified consistently enough to mark attendance.
+        With tracking, a track needs min_votes_for_attendance agreeing votes;
+        without it, any identified face counts (previous behaviour).
+        """
+        return self._confirmed_ids
+
+    def _compute_confirmed(self, results):
+        if self.use_tracking:
+            return frozenset(self._tracker.confirmed_ids(self.min_votes_for_attendance))
+        return frozenset(sid for sid, _, _ in results if sid)
+
+    def match_encodings(self, encodings, k=1):
+        """
+        Batched identification for every face in a frame.
+
+        Stacks the M query encodings and searches the gallery index in one call
+        (flat: full M x N distance matrix via ||a||^2 + ||b||^2 - 2ab with
+        precomputed known-norms; IVF: the same expansion over probed cells only).
+        Returns, per query, up to k [(student_id, distance), ...] sorted by distance,
+        one entry per student (its closest template).
+        """
+        if len(encodings) == 0:
+            return []
+        q = np.asarray(encodings, dtype=np.float32).reshape(len(encodings), -1)  # (M,128), gallery dtype
+
+        # Gallery updates patch rows in place, so search under the lock
+        with self._gallery_lock:
+            index, known_ids = self._search
+            if index is None or index.size != len(known_ids):
+                return [[] for _ in range(len(encodings))]
+            idx, dists = index.search(q, k)
+
+        return [
+            [(known_ids[j], float(d)) for j, d in zip(row_idx, row_d) if j >= 0]
+            for row_idx, row_d in zip(idx.tolist(), dists.tolist())
+        ]
+
+    def _encode(self, image, face_locations):
+        """Encode faces, using the process pool when enabled and worth the IPC cost."""
+        t0 = time.perf_counter()
+        workers = int(self.encoder_workers or 0)
+        if workers > 1 and len(face_locations) >= self.min_faces_for_pool:
+            if self._pool is None or self._pool.workers != workers:
+                from src.parallel import EncodingPool
+                self.close()
+                self._pool = EncodingPool(workers)
+            encs = self._pool.encode(image, face_locations)
+        else:
+            encs = face_recognition.face_encodings(image, face_locations)
+        self._cycle_encode_ms += (time.perf_counter() - t0) * 1000.0
+        return encs
+
+    def export_tracks(self):
+        """Identified tracks for a session snapshot (see FaceTracker.export_identities)."""
+        return self._tracker.export_identities() if self.use_tracking else []
+
+    def restore_tracks(self, rows):
+        """Seed the tracker from a snapshot taken against the same gallery generation."""
+        if not self.use_tracking:
+            return
+        self._tracker.reset()
+        self._tracker.restore_identities(rows)
+        self._last_results = self._tracker.results()
+        self._confirmed_ids = self._compute_confirmed(self._last_results)
+
+    def close(self):
+        """Release the encoding process pool (if one was started)."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def _resolve(self, candidates):
+        """(student_id, name, distance) for a match_encodings() row, applying the threshold."""
+        if candidates:
+            best_id, best_dist = candidates[0]
+            if best_dist < float(self.threshold):
+                return best_id, self.student_names.get(best_id, "Unknown"), best_dist
+            return None, "Unknown", best_dist
+        return None, "Unknown", None
+
+    def _run_heavy(self, frame_rgb):
+        """Detection + encoding + identification on one frame."""
+        self._cycle_encode_ms = 0.0
+        t0 = time.perf_counter()
+        results, faces = self._detect_and_match(frame_rgb)
+        if self.adaptive:
+            total_ms = (time.perf_counter() - t0) * 1000.0
+            self.scheduler.record_cycle(total_ms - self._cycle_encode_ms, self._cycle_encode_ms, faces)
+        return results
+
+    def _detect_and_match(self, frame_rgb):
+        """Returns (results, number of detected faces)."""
+        # 1) Resize for speed (the scheduler owns the scale while adaptive)
+        sf = float(self.scheduler.scale_factor if self.adaptive else self.scale_factor)
         if sf <= 0 or sf >= 1:
             sf = 0.20
 
         small = cv2.resize(frame_rgb, (0, 0), fx=sf, fy=sf, interpolation=cv2.INTER_LINEAR)
 
-        # 2) Detect faces (HOG is fastest on CPU)
-        face_locations = face_recognition.face_locations(small, model=self.detect_model)
+        # 2) Detect faces (HOG is fastest on CPU), only where something changed if possible
+        face_locations = self._detect(small, sf)
+
+        if self.use_tracking:
+            return self._identify_tracks(frame_rgb, small, face_locations, sf), len(face_locations)
 
         if not face_locations:
-            self._last_results = []
-            return self._last_results
+            return [], 0
 
         # 3) Encode faces
-        face_encs = face_recognition.face_encodings(small, face_locations)
+        face_encs = self._encode(*self._encoding_input(frame_rgb, small, face_locations, sf))
+        self.encodings_run += len(face_locations)
 
         results = []
-        scale_back = int(round(1.0 / sf))
+        inv = 1.0 / sf  # sf moves in small steps, so map back with the exact inverse
 
-        # 4) Identify each face (vectorized distance, same threshold behavior)
-        for i, face_encoding in enumerate(face_encs):
-            student_id = None
-            name = "Unknown"
+        # 4) Identify all faces at once (one M x N distance matrix, same threshold behavior)
+        matches = self.match_encodings(face_encs, k=1)
 
-            if self._enc_matrix is not None and self._enc_matrix.size:
-                fe = np.asarray(face_encoding, dtype=np.float64)
-                # Euclidean distance: faster than calling face_recognition.face_distance repeatedly
-                diffs = self._enc_matrix - fe
-                dists = np.sqrt(np.sum(diffs * diffs, axis=1))
-                best_idx = int(np.argmin(dists))
-                best_dist = float(dists[best_idx])
-
-                if best_dist < float(self.threshold):
-                    student_id = self.known_ids[best_idx]
-                    name = self.student_names.get(student_id, "Unknown")
+        for i, candidates in enumerate(matches):
+            student_id, name, _ = self._resolve(candidates)
 
             top, right, bottom, left = face_locations[i]
-            loc = (top * scale_back, right * scale_back, bottom * scale_back, left * scale_back)
+            loc = (int(round(top * inv)), int(round(right * inv)), int(round(bottom * inv)), int(round(left * inv)))
             results.append((student_id, name, loc))
 
-        self._last_results = results
-        return results
+        return results, len(face_locations)
+
+    def _detect(self, small, sf):
+        """HOG detection on motion / track regions, with periodic full-frame scans."""
+        regions = None
+        if self.use_motion_roi:
+            track_boxes = []
+            if self.use_tracking:
+                track_boxes = [
+                    tuple(v * sf for v in t.box) for t in self._tracker.tracks
+                ]
+            regions = self._motion.regions(small, track_boxes)
+
+        if regions is None:
+            self.full_scans += 1
+            return face_recognition.face_locations(small, model=self.detect_model)
+
+        self.roi_scans += 1
+        locations = []
+        for top, right, bottom, left in regions:
+            # dlib rejects non-contiguous views
+            crop = np.ascontiguousarray(small[top:bottom, left:right])
+            for t, r, b, l in face_recognition.face_locations(crop, model=self.detect_model):
+                locations.append((t + top, r + left, b + top, l + left))
+        return locations
+
+    def _encoding_input(self, frame_rgb, small, locations, sf):
+        """
+        (image, locations) to encode from. With encode_full_res the small-frame boxes
+        are mapped onto the original frame, so distant faces are encoded from real
+        pixels instead of a ~20 px thumbnail; dlib aligns a 150x150 chip either way,
+        so the encoding cost barely changes.
+        """
+        if not self.encode_full_res:
+            return small, locations
+
+        h, w = frame_rgb.shape[:2]
+        inv = 1.0 / sf
+        full = [
+            (max(0, int(round(t * inv))), min(w, int(round(r * inv))),
+             min(h, int(round(b * inv))), max(0, int(round(l * inv))))
+            for (t, r, b, l) in locations
+        ]
+        return frame_rgb, full
+
+    def _identify_tracks(self, frame_rgb, small, face_locations, sf):
+        """Associate detections with tracks; encode only new or stale tracks."""
+        now = time.time()
+        inv = 1.0 / sf
+        boxes = [(t * inv, r * inv, b * inv, l * inv) for (t, r, b, l) in face_locations]
+
+        pending = self._tracker.associate(boxes, now)
+        self.encodings_saved += len(boxes) - len(pending)
+        if pending:
+            locs = [face_locations[bi] for _, bi in pending]
+            encs = self._encode(*self._encoding_input(frame_rgb, small, locs, sf))
+            self.encodings_run += len(locs)
+            for (track, _), candidates in zip(pending, self.match_encodings(encs, k=1)):
+                student_id, name, dist = self._resolve(candidates)
+                track.vote(student_id, name, dist, now)
+
+        return self._tracker.results()
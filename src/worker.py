@@ -0,0 +1,94 @@
+import threading
+import time
+
+
+class RecognitionWorker:
+    """
+    Runs FaceRecognizer.detect_and_identify off the Tk main thread.
+
+    The worker waits (CameraManager.get_latest, no polling) for a frame newer
+    than the last one it processed, runs recognition on it and publishes the
+    result into a single latest-value slot. The UI loop only
+    reads that slot, so display FPS follows the camera while overlays lag by at
+    most one recognition cycle.
+    """
+
+    def __init__(self, camera, recognizer):
+        self.camera = camera
+        self.recognizer = recognizer
+
+        self.running = False
+        self.thread = None
+
+        # Latest-value slot: the results list is replaced as a whole.
+        # Rebinding an attribute is atomic, so readers never need a lock.
+        self._latest = []
+
+        # Telemetry (read by the UI for the FPS overlay)
+        self.recognition_fps = 0.0
+        self._last_heavy_count = 0
+        self._last_heavy_time = 0.0
+        self.frames_skipped = 0           # captured frames that arrived while a cycle was running
+        self.frame_latency_ms = 0.0       # capture -> result published, smoothed
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._last_heavy_time = 0.0
+        self.recognition_fps = 0.0
+        self.frame_latency_ms = 0.0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    def get_results(self):
+        """Latest published detections: [(student_id, name, (top,right,bottom,left)), ...]"""
+        return self._latest
+
+    def _run(self):
+        last_seq = 0
+        while self.running:
+            # Block until a newer frame than the last one processed, leasing its ring slot
+            # (the camera won't overwrite it while we work on it). The timeout re-checks running.
+            with self.camera.latest_frame(after_seq=last_seq, timeout=0.1) as (seq, captured_at, frame):
+                if frame is None:
+                    continue
+                if last_seq:
+                    self.frames_skipped += seq - last_seq - 1
+                last_seq = seq
+                try:
+                    results = self.recognizer.detect_and_identify(frame)
+                except Exception as e:
+                    print(f"Recognition Worker Error: {e}")
+                    results = None
+
+            if results is None:
+                time.sleep(0.05)
+                continue
+
+            self._latest = results
+            latency = (time.monotonic() - captured_at) * 1000.0
+            self.frame_latency_ms = latency if self.frame_latency_ms == 0 else 0.9 * self.frame_latency_ms + 0.1 * latency
+            self._update_fps()
+
+    def _update_fps(self):
+        """Recognition FPS counts only heavy (detect + encode) cycles, not cached returns."""
+        heavy = self.recognizer.heavy_cycles
+        if heavy == self._last_heavy_count:
+            return
+        self._last_heavy_count = heavy
+
+        now = time.time()
+        if self._last_heavy_time > 0:
+            dt = now - self._last_heavy_time
+            if dt > 0:
+                inst = 1.0 / dt
+                # Smooth so the overlay number is readable
+                self.recognition_fps = inst if self.recognition_fps == 0 else (0.8 * self.recognition_fps + 0.2 * inst)
+        self._last_heavy_time = now